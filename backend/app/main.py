@@ -2,7 +2,7 @@ import os
 import sys
 import logging
 from pathlib import Path
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from contextlib import asynccontextmanager
 from typing import Optional, List
 
@@ -26,7 +26,7 @@ from fastapi.responses import FileResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+from sqlalchemy import desc, func, select, text
 
 # =============================================================================
 # LOCAL APPLICATION IMPORTS
@@ -41,6 +41,7 @@ from app.utility.helper_functions import fetch_all_master_data
 from app.utility.training_helper_function import (
     enrich_recommendation,
     compute_and_cache_recommendations,
+    load_recommendation_snapshot,
 )
 
 # Video Generation & Queue
@@ -97,6 +98,12 @@ logger = logging.getLogger(__name__)
 # Initialize database tables (idempotent)
 logger.info("Initializing database tables...")
 models.Base.metadata.create_all(bind=engine)
+try:
+    with engine.begin() as conn:
+        for ddl in (*models.PROVISION_INDEX_DDL, *models.SERVICE_VIDEO_INDEX_DDL):
+            conn.execute(text(ddl))
+except Exception as e:
+    logger.warning(f"⚠️ Could not create startup indexes: {e}")
 logger.info("Database initialization complete")
 
 
@@ -234,13 +241,14 @@ def service_training_recommendation(
     base_query = db.query(models.TrainingRecommendationCache)
 
     # Apply optional filters
+    bsk_ids = None
     if district_filter:
-        bsks_in_district = (
-            db.query(models.BSKMaster.bsk_id)
-            .filter(models.BSKMaster.district_name.ilike(f"%{district_filter}%"))
-            .all()
-        )
-        bsk_ids = [b[0] for b in bsks_in_district]
+        # Core select of the bare IDs: no Row objects to unpack
+        bsk_ids = db.scalars(
+            select(models.BSKMaster.bsk_id).where(
+                models.BSKMaster.district_name.ilike(f"%{district_filter}%")
+            )
+        ).all()
         base_query = base_query.filter(
             models.TrainingRecommendationCache.bsk_id.in_(bsk_ids)
         )
@@ -257,8 +265,27 @@ def service_training_recommendation(
             >= min_training_services
         )
 
-    # Get total count
-    total_count = base_query.count()
+    # Fetch all results: from the in-memory Feather snapshot when it matches
+    # the DB cache (same filters applied in memory), else from SQL
+    snapshot = load_recommendation_snapshot(db)
+    if snapshot is not None:
+        district_bsks = set(bsk_ids) if bsk_ids is not None else None
+        precomp_res = [
+            r
+            for r in snapshot
+            if (district_bsks is None or r.bsk_id in district_bsks)
+            and (min_priority is None or r.priority_score >= min_priority)
+            and (
+                min_training_services is None
+                or r.total_training_services >= min_training_services
+            )
+        ]
+    else:
+        precomp_res = base_query.order_by(
+            desc(models.TrainingRecommendationCache.priority_score)
+        ).all()
+
+    total_count = len(precomp_res)
 
     if total_count == 0:
         return {
@@ -271,11 +298,6 @@ def service_training_recommendation(
             }
         }
 
-    # Fetch all results
-    precomp_res = base_query.order_by(
-        desc(models.TrainingRecommendationCache.priority_score)
-    ).all()
-
     logger.info(f"Retrieved {len(precomp_res)} recommendations from cache")
 
     # Enrich with master table data AND video URLs
@@ -286,7 +308,7 @@ def service_training_recommendation(
 
     # SUMMARY MODE
     if summary_only:
-        all_matching = base_query.all()
+        all_matching = precomp_res
 
         return {
             "status": "success",
@@ -1271,8 +1293,8 @@ def sync_table(
 
         # Validate date range if both provided
         if start_date and end_date:
-            start = datetime.strptime(start_date, "%Y-%m-%d")
-            end = datetime.strptime(end_date, "%Y-%m-%d")
+            start = date.fromisoformat(start_date)
+            end = date.fromisoformat(end_date)
 
             if start > end:
                 raise HTTPException(
@@ -1290,10 +1312,14 @@ def sync_table(
 
         # Handle "all tables" request
         if table == "all":
-            # Sync master tables first (drop & reload)
-            background_tasks.add_task(service.sync_master_table, "bsk_master")
-            background_tasks.add_task(service.sync_master_table, "deo_master")
-            background_tasks.add_task(service.sync_master_table, "service_master")
+            # Sync master tables first (drop & reload, in parallel)
+            async def run_master_sync():
+                results = await service.sync_all_masters()
+                for master, error in results.items():
+                    if error is not None:
+                        logger.error(f"❌ {master} sync FAILED: {error}")
+
+            background_tasks.add_task(run_master_sync)
 
             # Then sync provision (incremental)
             background_tasks.add_task(service.sync_provisions, start_date, end_date)
@@ -1405,8 +1431,6 @@ def trigger_training_precompute(
     logger.info("🚀 Manual training precompute triggered (365-day sliding window)")
 
     # Check if cache is fresh (optional - prevent unnecessary recomputes)
-    from datetime import datetime, timezone, timedelta
-    
     latest_cache = db.query(models.TrainingRecommendationCache)\
         .order_by(desc(models.TrainingRecommendationCache.timestamp))\
         .first()
@@ -1430,6 +1454,7 @@ def trigger_training_precompute(
             min_provision_threshold=5,
             lookback_days=365,  # ✅ FIXED: Always 365 days
         )
+        enrich_recommendation.cache_clear()
 
     # Run in background to avoid timeout
     background_tasks.add_task(run_precompute)
@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -8,7 +9,14 @@ load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# psycopg2 sends executemany INSERTs as multi-row VALUES pages (insertmanyvalues);
+# values_plus_batch extends that to UPDATE/DELETE via execute_batch, so a
+# parameter list costs a few round-trips instead of one per row.
+engine_kwargs = {}
+if make_url(SQLALCHEMY_DATABASE_URL).get_driver_name() == "psycopg2":
+    engine_kwargs["executemany_mode"] = "values_plus_batch"
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_kwargs)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
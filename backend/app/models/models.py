@@ -208,6 +208,7 @@ class Provision(Base):
     __tablename__ = "ml_provision"
     __table_args__ = (
     PrimaryKeyConstraint('customer_id', 'service_id', 'prov_date', 'docket_no'),
+    Index("idx_provision_bsk_service", "bsk_id", "service_id"),
     {"schema": "dbo"}
 )
 
@@ -234,6 +235,34 @@ class Provision(Base):
         return f"<Provision(customer_id='{self.customer_id}', service_id={self.service_id}, bsk_id={self.bsk_id})>"
 
 
+# Provision indexes that create_all only builds for a new table; run at
+# startup so existing databases get them too. All statements are idempotent.
+#
+# Sliding-window filter: prov_date is Text and a text -> date cast is only
+# STABLE in PostgreSQL, so it cannot be indexed directly; this IMMUTABLE
+# wrapper (exact for ISO dates) can. Queries must filter on
+# dbo.prov_date_as_date(prov_date) for the index to be used.
+#
+# (bsk_id, service_id): keeps rows clustered for the per-BSK/service
+# aggregation and serves per-BSK lookups. A partial index on the last 365
+# days is not possible (CURRENT_DATE is not immutable).
+PROVISION_INDEX_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION dbo.prov_date_as_date(value text)
+    RETURNS date LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    AS $$ SELECT value::date $$
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_provision_prov_date
+    ON dbo.ml_provision (dbo.prov_date_as_date(prov_date))
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_provision_bsk_service
+    ON dbo.ml_provision (bsk_id, service_id)
+    """,
+)
+
+
 class TrainingRecommendationCache(Base):
     """
     Optimized cache storing ONLY provision computations using parallel arrays.
@@ -659,6 +688,20 @@ class ServiceVideo(Base):
         return f"<ServiceVideo(id={self.video_id}, service='{self.service_name_metadata}', version={self.video_version}, done={self.is_done})>"
 
 
+# Expression index for the case-insensitive name fallback in
+# training_helper_function._latest_video_paths, which fills video_url for
+# recommended services that have no video under their service_id. A plain
+# index on service_name_metadata cannot serve lower(service_name_metadata).
+# Applied at startup like PROVISION_INDEX_DDL.
+SERVICE_VIDEO_INDEX_DDL = (
+    """
+    CREATE INDEX IF NOT EXISTS idx_service_name_lower_version
+    ON dbo.service_videos (lower(service_name_metadata), video_version DESC)
+    WHERE is_done AND is_active
+    """,
+)
+
+
 class VideoGenerationLog(Base):
     """
     Video Generation Log table
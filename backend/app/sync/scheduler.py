@@ -1,5 +1,6 @@
 # app/sync/scheduler.py
 
+import asyncio
 import logging
 from datetime import datetime
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -39,7 +40,7 @@ def sync_all_tables():
     🌙 NIGHTLY AUTO-SYNC JOB (Enhanced with Checkpoint Tracking)
 
     Syncs all tables with detailed tracking:
-    - Master tables: Full reload (truncate + insert)
+    - Master tables: Full reload (truncate + insert), synced in parallel
     - Provisions: Incremental sync (auto-detects last end_date)
 
     Features:
@@ -68,27 +69,24 @@ def sync_all_tables():
         # ====================================================================
         # SYNC MASTER TABLES (Full Reload)
         # ====================================================================
-        master_tables = ["bsk_master", "deo_master", "service_master"]
+        logger.info("-" * 80)
+        logger.info(f"📊 SYNCING: {', '.join(t.upper() for t in service.MASTER_TABLES)} (parallel)")
+        logger.info("-" * 80)
 
-        for table in master_tables:
-            try:
-                logger.info("-" * 80)
-                logger.info(f"📊 SYNCING: {table.upper()}")
-                logger.info("-" * 80)
+        # Per-table errors (including a failed login) come back in the dict
+        master_results = asyncio.run(service.sync_all_masters())
 
-                service.sync_master_table(table)
+        for table, error in master_results.items():
+            if error is None:
                 tables_succeeded.append(table)
 
                 # Display checkpoint summary
+                logger.info(f"📋 {table}:")
                 _log_checkpoint_summary(db, table)
-                logger.info("")
-
-            except Exception as e:
-                logger.error(f"❌ {table} sync FAILED: {e}")
+            else:
+                logger.error(f"❌ {table} sync FAILED: {error}")
                 tables_failed.append(table)
-                logger.info("")
-                # Continue with next table
-                continue
+        logger.info("")
 
         # ====================================================================
         # SYNC PROVISION TABLE (Incremental)
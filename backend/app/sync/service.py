@@ -1,19 +1,43 @@
+import io
 import os
+import itertools
+import copy
+import asyncio
 import logging
+import orjson
+import queue
 import requests
+import threading
 import time
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from datetime import date, timedelta
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import pandas as pd
+import psycopg2
+from psycopg2.extras import execute_values
+from sqlalchemy.engine import Connection, Row
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import case, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DataError, IntegrityError
 from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib3.util.ssl_ import create_urllib3_context
 
 from app.models import models
-from app.models.database import engine
+from app.models.database import engine, SessionLocal
+from app.utility.training_helper_function import invalidate_master_data
 
 logger = logging.getLogger(__name__)
 
+# NULL marker for COPY ... (FORMAT csv); an unquoted empty field then reads
+# back as '' instead of NULL
+COPY_NULL = r"\N"
+
+# COPY runs on the raw DBAPI cursor, so its errors arrive unwrapped by SQLAlchemy
+ROW_ERRORS = (IntegrityError, DataError, psycopg2.IntegrityError, psycopg2.DataError)
+
 # ---------------------------------------------------------------------------
 # SSL ADAPTER (legacy govt servers)
 # ---------------------------------------------------------------------------
@@ -26,6 +50,20 @@ class SSLContextAdapter(HTTPAdapter):
         return super().init_poolmanager(*args, **kwargs)
 
 
+# The sync endpoints are read-only, so POSTs are safe to retry.
+# pool_maxsize covers the provision window producers plus the masters.
+_API_ADAPTER = SSLContextAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=frozenset({"POST"}),
+    ),
+)
+
+
 # ---------------------------------------------------------------------------
 # API CONFIG (POST everywhere)
 # ---------------------------------------------------------------------------
@@ -51,16 +89,38 @@ class BSKAPIConfig:
 # SYNC SERVICE
 # ---------------------------------------------------------------------------
 class SyncService:
+    MASTER_TABLES = ("bsk_master", "deo_master", "service_master")
+    PROVISION_WINDOWS = 8
+    # Rows per executemany; keeps statement/bind buffers bounded on large pages
+    INSERT_CHUNK_SIZE = 1000
+    # Response keys the master endpoints have used for their row list
+    RECORD_KEYS = ("data", "results", "records")
+    TABLE_MODELS = {
+        "bsk_master": models.BSKMaster,
+        "deo_master": models.DEOMaster,
+        "service_master": models.ServiceMaster,
+        "provision": models.Provision,
+    }
+
     def __init__(self, db: Session):
         self.db = db
+        # One pooled keep-alive session for all calls. HTTP/2 (httpx + h2) is
+        # not used: h2 is not a dependency and the legacy-TLS adapter above is
+        # requests-specific; a large keep-alive pool covers the parallel fetches.
         self.session = requests.Session()
+        self.session.headers.update({"Connection": "keep-alive"})
 
-        adapter = SSLContextAdapter()
-        self.session.mount("https://", adapter)
-        self.session.mount("http://", adapter)
+        # Shared adapter: each sync reuses the connections (and legacy TLS
+        # handshakes) left in the pool by earlier ones
+        self.session.mount("https://", _API_ADAPTER)
+        self.session.mount("http://", _API_ADAPTER)
 
         self.config = BSKAPIConfig()
         self._is_authenticated = False
+        # INSERT ... VALUES %s text per (target, column order), built once
+        self._insert_stmt_cache: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+        # Which RECORD_KEYS entry each endpoint answered with, once seen
+        self._records_key: Dict[str, str] = {}
 
         logger.info("🔒 SSL adapter configured")
 
@@ -100,18 +160,21 @@ class SyncService:
         response = self.session.post(url, json=payload, timeout=60)
         response.raise_for_status()
         try:
-            return response.json()
+            # orjson decodes the raw bytes directly (no text decode + stdlib json pass)
+            return orjson.loads(response.content)
         except ValueError:
             logger.error("❌ Non-JSON response received")
             logger.error(response.text[:500])
             raise RuntimeError("API did not return JSON")
 
     # -------------------------------------------------------------------
-    # MASTER TABLES (DROP & RELOAD)
+    # MASTER TABLES (TRUNCATE & RELOAD, ONE TRANSACTION)
     # -------------------------------------------------------------------
     def sync_master_table(self, table_name: str):
         """
-        Sync master tables with enhanced checkpoint tracking
+        Sync master tables with enhanced checkpoint tracking.
+        The staging load, TRUNCATE and INSERT share one transaction (one
+        commit per sync); any error rolls back to the previous snapshot.
         """
         # 📊 START TRACKING
         start_time = time.time()
@@ -124,7 +187,7 @@ class SyncService:
             logger.info(f"🌐 Fetching {table_name}")
             data = self._post_json(url, {})
 
-            records = data.get("data") or data.get("results") or data.get("records") or []
+            records = self._extract_records(table_name, data)
             logger.info(f"📦 Fetched {len(records)} records")
 
             if not records:
@@ -140,12 +203,11 @@ class SyncService:
                 )
                 return
 
-            # Truncate table before inserting
-            logger.info(f"🗑️ Truncating table ml_{table_name}")
-            self._truncate_table(table_name)
-            
-            # Insert records with detailed logging
-            inserted, failed = self._bulk_insert_records(table_name, records)
+            # Stage records, then swap them in (TRUNCATE + INSERT) in one transaction
+            logger.info(f"🗑️ Reloading table ml_{table_name}")
+            inserted, failed = self._reload_master_table(table_name, records)
+            # Master data changed outside the ORM: drop memoized lookups
+            invalidate_master_data()
             
             # Calculate duration
             duration = int(time.time() - start_time)
@@ -195,6 +257,74 @@ class SyncService:
             )
             raise
 
+    def _extract_records(self, table_name: str, data: Dict) -> List[Dict]:
+        """Return the row list from a master response, remembering which key held it"""
+        key = self._records_key.get(table_name)
+        if key is not None:
+            return data.get(key) or []
+
+        for key in self.RECORD_KEYS:
+            records = data.get(key)
+            if records:
+                self._records_key[table_name] = key
+                return records
+        return []
+
+    async def sync_all_masters(self) -> Dict[str, Optional[Exception]]:
+        """
+        Sync all master tables concurrently.
+
+        The tables are independent, so each reload runs in its own worker
+        thread with its own DB session; wall time is the slowest table
+        instead of the sum. The HTTP session and token are shared.
+
+        Returns: {table_name: exception, or None on success}
+        """
+        # Blocking HTTP call (up to 30s); keep it off the event loop
+        try:
+            await asyncio.to_thread(self.ensure_authenticated)
+        except Exception as e:
+            # No table got to run: record the failure on every master checkpoint
+            await asyncio.to_thread(self._mark_masters_failed, e)
+            return {table: e for table in self.MASTER_TABLES}
+
+        # Dedicated pool sized to the tables, so all reloads start at once
+        # regardless of how busy the loop's default executor is
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=len(self.MASTER_TABLES)) as executor:
+            results = await asyncio.gather(
+                *(loop.run_in_executor(executor, self._sync_master_isolated, t) for t in self.MASTER_TABLES),
+                return_exceptions=True,
+            )
+        return {
+            table: (result if isinstance(result, Exception) else None)
+            for table, result in zip(self.MASTER_TABLES, results)
+        }
+
+    def _mark_masters_failed(self, error: Exception):
+        """Checkpoint every master table as failed with the same error"""
+        logger.error(f"❌ Master sync aborted before any table started: {error}")
+        for table in self.MASTER_TABLES:
+            self._mark_sync_running(table)
+            self._update_checkpoint_enhanced(
+                table_name=table,
+                success_count=0,
+                failed_count=0,
+                duration_seconds=0,
+                status='failed',
+                error_message=str(error)
+            )
+
+    def _sync_master_isolated(self, table_name: str):
+        """Run sync_master_table on a private DB session (SQLAlchemy sessions are not thread-safe)"""
+        db = SessionLocal()
+        try:
+            worker = copy.copy(self)
+            worker.db = db
+            worker.sync_master_table(table_name)
+        finally:
+            db.close()
+
     # -------------------------------------------------------------------
     # PROVISION (2-STEP FLOW: META → PAGINATION) - INSERT ONLY
     # -------------------------------------------------------------------
@@ -204,25 +334,35 @@ class SyncService:
         """
         # 📊 START TRACKING
         start_time = time.time()
-        self._mark_sync_running("provision")
+        cp = self._mark_sync_running("provision")
+        start_day: Optional[date] = None
+        end_day: Optional[date] = None
         
         try:
             self.ensure_authenticated()
             url = self.config.ENDPOINTS["provision"]
 
             # ---------------- STEP 1: DETERMINE DATE RANGE ----------------
-            if not start_date:
-                cp = self.db.query(models.SyncCheckpoint).filter_by(
-                    table_name="provision"
-                ).first()
-                
+            # Kept as date objects; only formatted for the API payloads
+            today = date.today()
+            if start_date:
+                start_day = date.fromisoformat(start_date)
+            else:
+                # Reuse the row returned by _mark_sync_running (no second SELECT)
+                if cp is None:
+                    cp = self.db.query(models.SyncCheckpoint).filter_by(
+                        table_name="provision"
+                    ).first()
+
                 # Use provision_end_date + 1 day as start_date for incremental sync
                 if cp and cp.provision_end_date:
-                    start_date = (cp.provision_end_date + timedelta(days=1)).strftime("%Y-%m-%d")
+                    start_day = cp.provision_end_date + timedelta(days=1)
                 else:
-                    start_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+                    start_day = today - timedelta(days=30)
 
-            end_date = end_date or datetime.now().strftime("%Y-%m-%d")
+            end_day = date.fromisoformat(end_date) if end_date else today
+            start_date = start_day.isoformat()
+            end_date = end_day.isoformat()
             
             logger.info(f"📅 Provision date range: {start_date} to {end_date}")
 
@@ -250,53 +390,28 @@ class SyncService:
                     duration_seconds=duration,
                     status='success',
                     error_message='No records in date range',
-                    provision_start_date=start_date,
-                    provision_end_date=end_date
+                    provision_start_date=start_day,
+                    provision_end_date=end_day
                 )
                 return
 
             # ---------------- STEP 3: PAGINATION (INSERT ONLY) ----------------
-            page_size = 1000
-            page = 1
+            # Each date window pages from Page=1, so the API never has to
+            # skip deep offsets, and the windows are fetched in parallel
+            windows = self._split_date_range(start_day, end_day, self.PROVISION_WINDOWS)
+            logger.info(f"🧩 Paging {len(windows)} date windows in parallel")
+
             synced = 0
             total_failed = 0
             errors = []
 
-            while True:
-                page_payload = {
-                    "start_date": start_date,
-                    "end_date": end_date,
-                    "Page": page,
-                    "Pagesize": page_size,
-                }
-
-                try:
-                    logger.info(f"📄 Provision page {page} (Records so far: {synced}/{total_records})")
-                    data = self._post_json(url, page_payload)
-                    records = data.get("records", [])
-
-                    if not records:
-                        logger.info("✅ No more provision records")
-                        break
-
-                    # INSERT ONLY (no upsert)
-                    inserted, failed = self._bulk_insert_records("provision", records)
-                    synced += inserted
-                    total_failed += failed
-
-                    logger.info(f"   ✓ Page {page}: {inserted} inserted, {failed} failed")
-                    page += 1
-
-                except Exception as e:
-                    # PAGINATION FAILURE HANDLER
-                    error_msg = f"Page {page} failed: {str(e)}"
-                    logger.error(f"❌ {error_msg}")
-                    errors.append(error_msg)
-                    
-                    logger.info("➡️ Skipping page and continuing")
-                    total_failed += page_size  # Assume all records in page failed
-                    page += 1
-                    continue
+            with ThreadPoolExecutor(max_workers=len(windows)) as executor:
+                for w_synced, w_failed, w_errors in executor.map(
+                    lambda w: self._sync_provision_window(url, *w), windows
+                ):
+                    synced += w_synced
+                    total_failed += w_failed
+                    errors.extend(w_errors)
 
             # ---------------- FINAL STATUS ----------------
             duration = int(time.time() - start_time)
@@ -320,8 +435,8 @@ class SyncService:
                 duration_seconds=duration,
                 status=status,
                 error_message=error_msg,
-                provision_start_date=start_date,
-                provision_end_date=end_date
+                provision_start_date=start_day,
+                provision_end_date=end_day
             )
             
             logger.info(f"✅ Provision sync complete: {synced} inserted, {total_failed} failed in {duration}s")
@@ -338,89 +453,377 @@ class SyncService:
                 duration_seconds=duration,
                 status='failed',
                 error_message=str(e),
-                provision_start_date=start_date if 'start_date' in locals() else None,
-                provision_end_date=end_date if 'end_date' in locals() else None
+                provision_start_date=start_day,
+                provision_end_date=end_day
             )
             raise
 
+    @staticmethod
+    def _split_date_range(start: date, end: date, parts: int) -> List[Tuple[date, date]]:
+        """Split an inclusive date range into up to `parts` contiguous windows"""
+        days = (end - start).days + 1
+        if days <= 1:
+            return [(start, end)]
+
+        step = -(-days // min(parts, days))  # ceil division
+        windows = []
+        window_start = start
+        while window_start <= end:
+            window_end = min(window_start + timedelta(days=step - 1), end)
+            windows.append((window_start, window_end))
+            window_start = window_end + timedelta(days=1)
+        return windows
+
+    def _sync_provision_window(self, url: str, start_day: date, end_day: date) -> Tuple[int, int, List[str]]:
+        """
+        Page through one provision date window.
+        A producer thread fetches page K+1 while this thread inserts page K;
+        the queue holds at most two fetched pages, so memory stays bounded.
+        Returns: (inserted_count, failed_count, error_messages)
+        """
+        start_date = start_day.isoformat()
+        end_date = end_day.isoformat()
+        page_size = 1000
+        synced = 0
+        total_failed = 0
+        errors = []
+
+        pages: queue.Queue = queue.Queue(maxsize=2)
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=self._fetch_provision_pages,
+            args=(url, start_date, end_date, page_size, pages, stop),
+            daemon=True,
+        )
+        producer.start()
+
+        try:
+            # One connection per window for all its pages (a transaction per page)
+            with engine.connect() as conn:
+                while True:
+                    item = pages.get()
+                    if item is None:
+                        logger.info(f"✅ No more provision records for {start_date}..{end_date}")
+                        break
+
+                    page, records, fetch_error = item
+                    try:
+                        if fetch_error is not None:
+                            raise fetch_error
+
+                        # INSERT ONLY (no upsert)
+                        inserted, failed = self._copy_insert_records(conn, "provision", records)
+                        synced += inserted
+                        total_failed += failed
+
+                        logger.info(f"   ✓ {start_date}..{end_date} page {page}: {inserted} inserted, {failed} failed")
+
+                    except Exception as e:
+                        # PAGINATION FAILURE HANDLER
+                        error_msg = f"{start_date}..{end_date} page {page} failed: {str(e)}"
+                        logger.error(f"❌ {error_msg}")
+                        errors.append(error_msg)
+
+                        logger.info("➡️ Skipping page and continuing")
+                        total_failed += page_size  # Assume all records in page failed
+        finally:
+            stop.set()
+            producer.join()
+
+        return synced, total_failed, errors
+
+    def _fetch_provision_pages(
+        self,
+        url: str,
+        start_date: str,
+        end_date: str,
+        page_size: int,
+        pages: queue.Queue,
+        stop: threading.Event,
+    ):
+        """
+        Producer for _sync_provision_window: queue (page, records, error) tuples
+        in page order until the API returns an empty page, then None.
+        """
+        # Built once; only "Page" changes between requests
+        page_payload = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "Page": 1,
+            "Pagesize": page_size,
+        }
+
+        def put(item) -> bool:
+            # Bounded put that gives up once the consumer has stopped
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        page = 1
+        while True:
+            page_payload["Page"] = page
+            try:
+                logger.info(f"📄 Provision {start_date}..{end_date} page {page}")
+                records = self._post_json(url, page_payload).get("records")
+            except Exception as e:
+                if not put((page, None, e)):
+                    return
+                page += 1
+                continue
+
+            if not records:
+                break
+            if not put((page, records, None)):
+                return
+            page += 1
+
+        put(None)
+
     # -------------------------------------------------------------------
     # DB OPS
     # -------------------------------------------------------------------
-    def _truncate_table(self, table: str):
-        """Truncate table to start fresh"""
+    def _create_staging_table(self, conn: Connection, table: str) -> str:
+        """Create a temp copy of ml_{table} (no constraints) that is dropped on commit"""
+        staging = f"tmp_ml_{table}"
+        conn.execute(text(
+            f"CREATE TEMP TABLE {staging} (LIKE dbo.ml_{table} INCLUDING DEFAULTS) ON COMMIT DROP"
+        ))
+        return staging
+
+    def _reload_master_table(self, table: str, records: List[Dict]) -> Tuple[int, int]:
+        """
+        Replace the contents of ml_{table} with `records` atomically.
+
+        Records are COPY-loaded into a staging table first; TRUNCATE + INSERT ...
+        SELECT then run at the end of the same transaction. The exclusive lock is
+        held only for the swap, and a failure leaves the previous snapshot intact.
+        If COPY rejects a value, the staging load falls back to row batches.
+        Returns: (inserted_count, failed_count)
+        """
+        with engine.begin() as conn:
+            staging = self._create_staging_table(conn, table)
+            try:
+                with conn.begin_nested():
+                    self._copy_to_staging(conn, staging, records)
+                staged = len(records)
+            except ROW_ERRORS as e:
+                logger.warning(f"⚠️ COPY into {staging} rejected the load ({e}); retrying row batches")
+                staged, _ = self._bulk_insert_records(table, records, conn=conn, target=staging)
+
+            if staged == 0:
+                # Nothing usable arrived; keep the current snapshot
+                return 0, len(records)
+
+            conn.execute(text(f"TRUNCATE TABLE dbo.ml_{table}"))
+            result = conn.execute(text(
+                f"INSERT INTO dbo.ml_{table} SELECT * FROM {staging} ON CONFLICT DO NOTHING"
+            ))
+
+        inserted = result.rowcount
+        logger.info(f"🔄 Table ml_{table} reloaded: {inserted} rows swapped in")
+        return inserted, len(records) - inserted
+
+    def _copy_insert_records(self, conn: Connection, table: str, records: List[Dict]) -> Tuple[int, int]:
+        """
+        Load a page of records with PostgreSQL COPY instead of per-row binds.
+
+        The page is serialized column-wise by pandas into a single CSV buffer,
+        copied into a temp staging table and moved into ml_{table} server-side.
+        Rows that already exist are skipped and counted as failed, as the
+        row-insert path would. If the COPY rejects the page (bad value),
+        falls back to _bulk_insert_records to isolate the offending rows.
+        Runs in its own transaction on `conn`, which the caller keeps checked
+        out across pages.
+        Returns: (inserted_count, failed_count)
+        """
         try:
-            with engine.begin() as conn:
-                conn.execute(text(f"TRUNCATE TABLE dbo.ml_{table}"))
-            logger.info(f"🗑️ Table ml_{table} truncated successfully")
-        except Exception as e:
-            logger.error(f"❌ Failed to truncate table ml_{table}: {e}")
-            raise
+            with conn.begin():
+                staging = self._create_staging_table(conn, table)
+                cols = self._copy_to_staging(conn, staging, records)
+                result = conn.execute(text(
+                    f"INSERT INTO dbo.ml_{table} ({cols}) SELECT {cols} FROM {staging} "
+                    f"ON CONFLICT DO NOTHING"
+                ))
+        except ROW_ERRORS as e:
+            logger.warning(f"⚠️ COPY into ml_{table} rejected the page ({e}); retrying row batches")
+            with conn.begin():
+                return self._bulk_insert_records(table, records, conn=conn)
+
+        inserted = result.rowcount
+        return inserted, len(records) - inserted
+
+    def _copy_to_staging(self, conn: Connection, staging: str, records: List[Dict]) -> str:
+        """
+        COPY records into a staging table, one CSV buffer built by pandas per
+        key signature (usually just one).
+
+        Stores the same values as the row-insert path: None is written as an
+        explicit NULL marker, so '' stays an empty string, and columns a
+        record has no key for get the staging table's column default.
+        Returns: the comma-joined list of every loaded column
+        """
+        groups: Dict[Tuple[str, ...], List[Dict]] = {}
+        for record in records:
+            groups.setdefault(tuple(record), []).append(record)
+
+        cursor = conn.connection.cursor()
+        loaded: Dict[str, None] = {}
+        for keys, group in groups.items():
+            # object dtype keeps ints as ints (no float upcast when a value is None)
+            df = pd.DataFrame(group, columns=list(keys), dtype=object)
+            buffer = io.StringIO()
+            df.to_csv(buffer, index=False, header=False, na_rep=COPY_NULL)
+            buffer.seek(0)
+
+            cols = ",".join(keys)
+            cursor.copy_expert(
+                f"COPY {staging} ({cols}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                buffer,
+            )
+            loaded.update(dict.fromkeys(keys))
+        return ",".join(loaded)
 
-    def _bulk_insert_records(self, table: str, records: List[Dict]) -> Tuple[int, int]:
+    def _bulk_insert_records(
+        self,
+        table: str,
+        records: List[Dict],
+        conn: Optional[Connection] = None,
+        target: Optional[str] = None,
+    ) -> Tuple[int, int]:
         """
-        Insert records with DETAILED ERROR LOGGING
+        Insert records with one multi-row INSERT per column signature, in chunks of
+        INSERT_CHUNK_SIZE, all inside a single transaction.
+        Bad rows are isolated by splitting the failing chunk in halves.
+
+        Args:
+            table: Logical table name (ml_ prefix is implied)
+            records: Rows from the API
+            conn: Insert inside this open transaction instead of opening one
+            target: Table to insert into, defaults to dbo.ml_{table}
+
         Returns: (inserted_count, failed_count)
         """
+        if conn is None:
+            with engine.begin() as conn:
+                return self._bulk_insert_records(table, records, conn=conn, target=target)
+
+        # executemany needs every parameter set to share the same keys
+        first_keys = records[0].keys() if records else {}.keys()
+        if all(record.keys() == first_keys for record in records):
+            # Usual case: one endpoint, one shape -> one statement, one group
+            groups: Dict[FrozenSet[str], List[Dict]] = {frozenset(first_keys): records}
+        else:
+            groups = {}
+            for record in records:
+                groups.setdefault(frozenset(record.keys()), []).append(record)
+
         inserted = 0
-        failed = 0
-        
-        for idx, record in enumerate(records):
-            try:
-                self._insert_record(table, record)
-                inserted += 1
-            except Exception as e:
-                failed += 1
-                # DETAILED ERROR LOGGING (only first 5 failures to avoid log spam)
-                if failed <= 5:
-                    logger.error(f"❌ Insert failed for record {idx+1}/{len(records)} in {table}")
-                    logger.error(f"   Error: {str(e)}")
-                    logger.error(f"   Record keys: {list(record.keys())}")
-                    sample_values = {k: str(v)[:50] for k, v in list(record.items())[:3]}
-                    logger.error(f"   Sample values: {sample_values}")
-        
+        failures: List[Tuple[Dict, Exception]] = []
+        for columns, group in groups.items():
+            if not columns:
+                failures.extend((record, ValueError("Cannot insert empty record")) for record in group)
+                continue
+            # Positional tuples in one fixed column order: the driver binds
+            # them directly, with no per-row dict lookups or bind processors
+            ordered = tuple(group[0].keys())
+            sql = self._insert_statement(target or self.TABLE_MODELS[table].__table__.fullname, ordered)
+            getter = itemgetter(*ordered)
+            rows = [getter(r) for r in group] if len(ordered) > 1 else [(getter(r),) for r in group]
+            for i in range(0, len(group), self.INSERT_CHUNK_SIZE):
+                j = i + self.INSERT_CHUNK_SIZE
+                inserted += self._insert_batch(conn, sql, rows[i:j], group[i:j], failures)
+
+        failed = len(failures)
+        if not failed:
+            return inserted, 0
+
+        # DETAILED ERROR LOGGING (only first 5 failures to avoid log spam)
+        header = f"❌ Insert failed for record in {table} ({failed}/{len(records)} failed)"
+        for record, e in failures[:5]:
+            logger.error(header)
+            logger.error(f"   Error: {str(e)}")
+            logger.error(f"   Record keys: {list(record.keys())}")
+            sample_values = {k: str(v)[:50] for k, v in itertools.islice(record.items(), 3)}
+            logger.error(f"   Sample values: {sample_values}")
+
         # Log summary if many failures
         if failed > 5:
             logger.error(f"⚠️ {failed - 5} additional insert failures (not logged in detail)")
-        
+
         return inserted, failed
 
-    def _insert_record(self, table: str, record: Dict):
-        """Insert a single record into the database"""
-        if not record:
-            raise ValueError("Cannot insert empty record")
-            
-        cols = ",".join(record.keys())
-        vals = ",".join(f":{k}" for k in record.keys())
-        q = text(f"INSERT INTO dbo.ml_{table} ({cols}) VALUES ({vals})")
-        
-        with engine.begin() as conn:
-            conn.execute(q, record)
+    def _insert_statement(self, target: str, columns: Tuple[str, ...]) -> str:
+        """Build (once) the execute_values INSERT for one target and column order"""
+        key = (target, columns)
+        sql = self._insert_stmt_cache.get(key)
+        if sql is None:
+            sql = self._insert_stmt_cache[key] = f"INSERT INTO {target} ({','.join(columns)}) VALUES %s"
+        return sql
+
+    def _insert_batch(
+        self,
+        conn: Connection,
+        sql: str,
+        rows: List[Tuple],
+        records: List[Dict],
+        failures: List[Tuple[Dict, Exception]],
+    ) -> int:
+        """
+        Insert a same-shape batch as one multi-row VALUES statement.
+        `rows` are the positional tuples for `records` (kept for error reports).
+        On a row-level error, bisect the batch until the bad rows are isolated,
+        so retries are O(log N) per failing row instead of one INSERT per row.
+        The statement is built once by the caller and reused at every level.
+        """
+        try:
+            # Savepoint, so a failed batch does not abort the page transaction
+            with conn.begin_nested():
+                execute_values(conn.connection.cursor(), sql, rows, page_size=len(rows))
+            return len(rows)
+        except ROW_ERRORS as e:
+            if len(rows) == 1:
+                failures.append((records[0], e))
+                return 0
+
+        mid = len(rows) // 2
+        return (
+            self._insert_batch(conn, sql, rows[:mid], records[:mid], failures)
+            + self._insert_batch(conn, sql, rows[mid:], records[mid:], failures)
+        )
 
     # -------------------------------------------------------------------
     # ENHANCED CHECKPOINT MANAGEMENT
     # -------------------------------------------------------------------
-    def _mark_sync_running(self, table: str):
-        """Mark sync as running before starting"""
+    def _mark_sync_running(self, table: str) -> Optional[Row]:
+        """
+        Mark sync as running before starting (single upsert, no ORM load).
+        Returns: the checkpoint row as stored, or None if it could not be written
+        """
         try:
-            cp = self.db.query(models.SyncCheckpoint).filter_by(
-                table_name=table
-            ).first()
-
-            if not cp:
-                cp = models.SyncCheckpoint(
-                    table_name=table,
-                    total_records_synced=0,
-                    total_sync_runs=0,
-                    total_failures=0,
-                )
-                self.db.add(cp)
-
-            cp.sync_status = 'running'
+            cp = models.SyncCheckpoint.__table__
+            stmt = pg_insert(cp).values(
+                table_name=table,
+                sync_status='running',
+                total_records_synced=0,
+                total_sync_runs=0,
+                total_failures=0,
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[cp.c.table_name],
+                set_={"sync_status": stmt.excluded.sync_status},
+            ).returning(cp)
+            row = self.db.execute(stmt).one()
             self.db.commit()
+            return row
             
         except Exception as e:
             logger.error(f"❌ Failed to mark sync as running for {table}: {e}")
             self.db.rollback()
+            return None
 
     def _update_checkpoint_enhanced(
         self,
@@ -430,8 +833,8 @@ class SyncService:
         duration_seconds: int,
         status: str,
         error_message: Optional[str] = None,
-        provision_start_date: Optional[str] = None,
-        provision_end_date: Optional[str] = None
+        provision_start_date: Optional[date] = None,
+        provision_end_date: Optional[date] = None
     ):
         """
         Update sync checkpoint with comprehensive tracking
@@ -443,55 +846,60 @@ class SyncService:
             duration_seconds: Time taken for sync
             status: 'success', 'partial', 'failed'
             error_message: Error details if any
-            provision_start_date: Start date for provision sync (YYYY-MM-DD)
-            provision_end_date: End date for provision sync (YYYY-MM-DD)
+            provision_start_date: Start date for provision sync
+            provision_end_date: End date for provision sync
         """
         try:
-            cp = self.db.query(models.SyncCheckpoint).filter_by(
-                table_name=table_name
-            ).first()
-
-            if not cp:
-                cp = models.SyncCheckpoint(
-                    table_name=table_name,
-                    total_records_synced=0,
-                    total_sync_runs=0,
-                    total_failures=0,
-                    first_sync_date=datetime.now()
-                )
-                self.db.add(cp)
-
-            # Update last sync statistics
-            cp.last_sync_date = datetime.now()
-            cp.last_sync_success_count = success_count
-            cp.last_sync_failed_count = failed_count
-            cp.last_sync_duration_seconds = duration_seconds
-            cp.sync_status = status
-            cp.error_message = error_message
-
-            # Update cumulative statistics
-            cp.total_records_synced += success_count
-            cp.total_failures += failed_count
-            cp.total_sync_runs += 1
-
-            # Calculate average duration
-            if cp.avg_sync_duration_seconds:
-                cp.avg_sync_duration_seconds = (
-                    (cp.avg_sync_duration_seconds * (cp.total_sync_runs - 1) + duration_seconds)
-                    // cp.total_sync_runs
-                )
-            else:
-                cp.avg_sync_duration_seconds = duration_seconds
+            cp = models.SyncCheckpoint.__table__
+            now = func.now()
+
+            # Last sync statistics (also the initial row on first sync)
+            values = {
+                "table_name": table_name,
+                "last_sync_date": now,
+                "last_sync_success_count": success_count,
+                "last_sync_failed_count": failed_count,
+                "last_sync_duration_seconds": duration_seconds,
+                "sync_status": status,
+                "error_message": error_message,
+            }
 
             # Update last successful sync timestamp (only if status is success)
             if status == 'success':
-                cp.last_successful_sync = datetime.now()
+                values["last_successful_sync"] = now
 
             # Update provision-specific date range
             if table_name == "provision" and provision_start_date and provision_end_date:
-                cp.provision_start_date = datetime.strptime(provision_start_date, "%Y-%m-%d").date()
-                cp.provision_end_date = datetime.strptime(provision_end_date, "%Y-%m-%d").date()
+                values["provision_start_date"] = provision_start_date
+                values["provision_end_date"] = provision_end_date
+
+            stmt = pg_insert(cp).values(
+                **values,
+                total_records_synced=success_count,
+                total_failures=failed_count,
+                total_sync_runs=1,
+                avg_sync_duration_seconds=duration_seconds,
+                first_sync_date=now,
+            )
+
+            # Cumulative statistics are incremented server-side, so no prior
+            # SELECT is needed and concurrent syncs cannot lose updates
+            runs = func.coalesce(cp.c.total_sync_runs, 0)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[cp.c.table_name],
+                set_={
+                    **{k: stmt.excluded[k] for k in values if k != "table_name"},
+                    "total_records_synced": func.coalesce(cp.c.total_records_synced, 0) + success_count,
+                    "total_failures": func.coalesce(cp.c.total_failures, 0) + failed_count,
+                    "total_sync_runs": runs + 1,
+                    "avg_sync_duration_seconds": case(
+                        (func.coalesce(cp.c.avg_sync_duration_seconds, 0) == 0, duration_seconds),
+                        else_=(cp.c.avg_sync_duration_seconds * runs + duration_seconds) // (runs + 1),
+                    ),
+                },
+            )
 
+            self.db.execute(stmt)
             self.db.commit()
             
             logger.info(
@@ -1,5 +1,6 @@
 from typing import List
 import pandas as pd
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models import models
 import logging
@@ -10,18 +11,47 @@ logger = logging.getLogger(__name__)
 def convert_models_to_dataframe(model_list: List) -> pd.DataFrame:
     """
     Convert a list of SQLAlchemy model instances to a pandas DataFrame.
-    This utility function handles the conversion of ORM objects to a DataFrame
-    and removes SQLAlchemy's internal state tracking column.
+    Only mapped table columns are read, so SQLAlchemy's internal state
+    (_sa_instance_state) is never materialized.
     Args:
         model_list: List of SQLAlchemy model instances
     Returns:
         pd.DataFrame: DataFrame with model data, excluding internal state
     """
-    df = pd.DataFrame([item.__dict__ for item in model_list])
-    # Remove SQLAlchemy internal state column if present
-    if "_sa_instance_state" in df.columns:
-        df.drop("_sa_instance_state", axis=1, inplace=True)
-    return df
+    if not model_list:
+        return pd.DataFrame()
+    columns = [c.name for c in model_list[0].__table__.columns]
+    return pd.DataFrame.from_records(
+        [tuple(getattr(item, name) for name in columns) for item in model_list],
+        columns=columns,
+    )
+
+
+def fetch_table_dataframe(db: Session, model, chunksize: int = 50_000) -> pd.DataFrame:
+    """
+    Load a whole table into a DataFrame through Core, skipping ORM objects.
+    Rows are streamed from a server-side cursor in chunks, so the full result
+    set is never held as Python row objects alongside the DataFrame.
+    Args:
+        db: SQLAlchemy database session
+        model: Mapped model class whose table is read
+        chunksize: Rows fetched per round-trip
+    Returns:
+        pd.DataFrame: One column per table column
+    """
+    # stream_results is set for this statement only; Connection.execution_options()
+    # would switch the session's connection to server-side cursors for good
+    result = db.execute(
+        select(model.__table__), execution_options={"stream_results": True}
+    )
+    columns = list(result.keys())
+    chunks = [
+        pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+        for rows in result.partitions(chunksize)
+    ]
+    if not chunks:
+        return pd.DataFrame(columns=[c.name for c in model.__table__.columns])
+    return pd.concat(chunks, ignore_index=True)
 
 
 def fetch_all_master_data(db: Session) -> tuple:
@@ -37,21 +67,15 @@ def fetch_all_master_data(db: Session) -> tuple:
     """
     logger.info("Fetching all master data from database...")
 
-    # Retrieve all records from each table
-    bsks = db.query(models.BSKMaster).all()
-    provisions = db.query(models.Provision).all()
-    deos = db.query(models.DEOMaster).all()
-    services = db.query(models.ServiceMaster).all()
+    # Rows are streamed from the cursor into DataFrames (no ORM instances)
+    bsks_df = fetch_table_dataframe(db, models.BSKMaster)
+    provisions_df = fetch_table_dataframe(db, models.Provision)
+    deos_df = fetch_table_dataframe(db, models.DEOMaster)
+    services_df = fetch_table_dataframe(db, models.ServiceMaster)
 
     logger.info(
-        f"Retrieved {len(bsks)} BSKs, {len(provisions)} provisions, "
-        f"{len(deos)} DEOs, {len(services)} services"
+        f"Retrieved {len(bsks_df)} BSKs, {len(provisions_df)} provisions, "
+        f"{len(deos_df)} DEOs, {len(services_df)} services"
     )
 
-    # Convert to DataFrames and clean up
-    bsks_df = convert_models_to_dataframe(bsks)
-    provisions_df = convert_models_to_dataframe(provisions)
-    deos_df = convert_models_to_dataframe(deos)
-    services_df = convert_models_to_dataframe(services)
-
     return bsks_df, provisions_df, deos_df, services_df
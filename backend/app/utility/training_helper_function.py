@@ -1,13 +1,23 @@
 import logging
 from datetime import datetime, timedelta
 import time
+import threading
+from collections import OrderedDict
 from fastapi import HTTPException
+from sqlalchemy import desc, event, func, select
 from sqlalchemy.orm import Session
 from app.models import models
 import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
 import numpy as np
-from typing import Dict, List
-import json
+from joblib import Parallel, delayed, effective_n_jobs
+from numba import njit, prange
+from scipy.sparse import csr_matrix
+from sklearn.neighbors import BallTree
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+import orjson
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
@@ -15,6 +25,73 @@ import os
 
 load_dotenv()
 BASE_VIDEO_URL = os.getenv("BASE_URL", "https://videos.example.com/")
+# Below this many BSKs the recommendation loop runs in-process
+PARALLEL_MIN_BSKS = 2000
+RECOMMENDATION_SNAPSHOT_PATH = os.getenv(
+    "RECOMMENDATION_SNAPSHOT_PATH", "training_recommendation_cache.feather"
+)
+# Reason text shared by the compute run and the enrichment path
+_REASON_TMPL = (
+    "Nearby BSKs (within {nn} nearest) are performing "
+    "{avg:.1f} provisions on average for '{name}', "
+    "while this BSK has only {cur} provisions. "
+    "This service is highly demanded in the area ({tot} "
+    "total provisions in neighborhood)."
+)
+
+
+# In-process LRU of enriched recommendations. A key covers one cache row
+# generation (bsk_id + timestamp), one master-data epoch (bumped on ORM
+# writes to BSK/Service/ServiceVideo and by invalidate_master_data after
+# master syncs) and one TTL bucket, which bounds staleness from writes in
+# other processes. The services table used by compute runs is cached the
+# same way (per epoch + TTL bucket).
+ENRICH_CACHE_SIZE = 4096
+ENRICH_CACHE_TTL = int(os.getenv("ENRICH_CACHE_TTL", "300"))
+_enrich_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+_enrich_lock = threading.Lock()
+_services_cache: Dict[tuple, pd.DataFrame] = {}
+_master_epoch = 0
+
+
+def _bump_master_epoch(*_):
+    global _master_epoch
+    _master_epoch += 1
+
+
+for _model in (models.BSKMaster, models.ServiceMaster, models.ServiceVideo):
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event, _bump_master_epoch)
+
+
+def clear_enrichment_cache() -> None:
+    """Drop all memoized enrich_recommendation results."""
+    with _enrich_lock:
+        _enrich_cache.clear()
+
+
+def invalidate_master_data() -> None:
+    """
+    Mark master data as changed when it was written outside the ORM (e.g.
+    the COPY-based master sync, which fires no mapper events).
+    """
+    _bump_master_epoch()
+    _services_cache.clear()
+    clear_enrichment_cache()
+
+
+def _load_services(db: Session) -> pd.DataFrame:
+    """Services master (small), reused across compute runs until it changes."""
+    key = (_master_epoch, int(time.time() // ENRICH_CACHE_TTL))
+    services_df = _services_cache.get(key)
+    if services_df is None:
+        Svc = models.ServiceMaster
+        services_df = _query_to_dataframe(
+            db, select(Svc.service_id, Svc.service_name, Svc.service_type)
+        )
+        _services_cache.clear()
+        _services_cache[key] = services_df
+    return services_df
 
 
 def enrich_recommendation(cache_rec, db: Session) -> dict:
@@ -22,6 +99,37 @@ def enrich_recommendation(cache_rec, db: Session) -> dict:
     Enrich cached provision data with real-time master table data.
     This is FAST because master tables are small (BSK, DEO, Service).
 
+    Results are memoized (see ENRICH_CACHE_SIZE / ENRICH_CACHE_TTL); a hit
+    runs no queries. The returned dict is shared, so treat it as read-only.
+    """
+    key = (
+        cache_rec.bsk_id,
+        cache_rec.timestamp,
+        _master_epoch,
+        int(time.time() // ENRICH_CACHE_TTL),
+    )
+    with _enrich_lock:
+        cached = _enrich_cache.get(key)
+        if cached is not None:
+            _enrich_cache.move_to_end(key)
+            return cached
+
+    result = _enrich_recommendation(cache_rec, db)
+
+    with _enrich_lock:
+        _enrich_cache[key] = result
+        if len(_enrich_cache) > ENRICH_CACHE_SIZE:
+            _enrich_cache.popitem(last=False)
+    return result
+
+
+enrich_recommendation.cache_clear = clear_enrichment_cache
+
+
+def _enrich_recommendation(cache_rec, db: Session) -> dict:
+    """
+    Uncached body of enrich_recommendation.
+
     UPDATED: Now includes video URLs for services that have training videos
 
     SIMPLIFIED: Removed unnecessary fields (bsk_lat, bsk_long, nearest_bsks,
@@ -48,6 +156,9 @@ def enrich_recommendation(cache_rec, db: Session) -> dict:
 
     service_lookup = {s.service_id: s for s in services}
 
+    # ✅ NEW: Latest video path per service (if exists), batched for all services
+    video_paths = _latest_video_paths(db, services)
+
     # Build recommended_services array
     recommended_services = []
     nearest_bsk_ids = cache_rec.nearest_bsks_id or []
@@ -66,40 +177,9 @@ def enrich_recommendation(cache_rec, db: Session) -> dict:
         nearby_avg = neigh_prov / num_neighbors if num_neighbors > 0 else 0
         gap = nearby_avg - current_prov
 
-        # ✅ NEW: Get latest video URL for this service (if exists)
         video_url = None
-
-        if service:
-            # Try to find video by service_id first (most reliable)
-            from sqlalchemy import desc, func
-
-            latest_video = (
-                db.query(models.ServiceVideo)
-                .filter(
-                    models.ServiceVideo.service_id == service_id,
-                    models.ServiceVideo.is_done == True,  # Only completed videos
-                    models.ServiceVideo.is_active == True,  # Only active videos
-                )
-                .order_by(desc(models.ServiceVideo.video_version))
-                .first()
-            )
-
-            # If not found by ID, try by service name
-            if not latest_video:
-                latest_video = (
-                    db.query(models.ServiceVideo)
-                    .filter(
-                        func.lower(models.ServiceVideo.service_name_metadata)
-                        == func.lower(service.service_name),
-                        models.ServiceVideo.is_done == True,
-                        models.ServiceVideo.is_active == True,
-                    )
-                    .order_by(desc(models.ServiceVideo.video_version))
-                    .first()
-                )
-
-            if latest_video:
-                video_url = f"{BASE_VIDEO_URL}/{latest_video.video_url}"
+        if service_id in video_paths:
+            video_url = f"{BASE_VIDEO_URL}/{video_paths[service_id]}"
 
         recommended_services.append(
             {
@@ -110,12 +190,14 @@ def enrich_recommendation(cache_rec, db: Session) -> dict:
                 "nearby_avg_provisions": round(nearby_avg, 2),
                 "gap": round(gap, 2),
                 "total_provisions_in_area": neigh_prov,
-                "reason": (
-                    f"Nearby BSKs (within {num_neighbors} nearest) are performing "
-                    f"{nearby_avg:.1f} provisions on average for '{service.service_name if service else 'this service'}', "
-                    f"while this BSK has only {current_prov} provisions. "
-                    f"This service is highly demanded in the area ({neigh_prov} total provisions in neighborhood)."
+                "reason": _REASON_TMPL.format(
+                    nn=num_neighbors,
+                    avg=nearby_avg,
+                    name=service.service_name if service else "this service",
+                    cur=current_prov,
+                    tot=neigh_prov,
                 ),
+                "video_url": video_url,
             }
         )
 
@@ -147,6 +229,52 @@ def enrich_recommendation(cache_rec, db: Session) -> dict:
     }
 
 
+def _latest_video_paths(db: Session, services: List) -> Dict[int, str]:
+    """
+    Latest completed, active video per service, in at most two queries
+    (DISTINCT ON keeps the highest video_version per key):
+    by service_id first (most reliable), then by case-insensitive service
+    name for the services that have no video under their ID.
+
+    Returns:
+        service_id -> stored video_url path
+    """
+    if not services:
+        return {}
+
+    Video = models.ServiceVideo
+    ready = (Video.is_done == True, Video.is_active == True)
+
+    paths = dict(
+        db.execute(
+            select(Video.service_id, Video.video_url)
+            .where(Video.service_id.in_([s.service_id for s in services]), *ready)
+            .distinct(Video.service_id)
+            .order_by(Video.service_id, desc(Video.video_version))
+        ).all()
+    )
+
+    # If not found by ID, try by service name (served by the
+    # idx_service_name_lower_version expression index)
+    missing = {}
+    for s in services:
+        if s.service_id not in paths and s.service_name:
+            missing.setdefault(s.service_name.lower(), []).append(s.service_id)
+    if missing:
+        name = func.lower(Video.service_name_metadata)
+        rows = db.execute(
+            select(name, Video.video_url)
+            .where(name.in_(list(missing)), *ready)
+            .distinct(name)
+            .order_by(name, desc(Video.video_version))
+        )
+        for service_name, video_url in rows:
+            for service_id in missing.get(service_name, []):
+                paths[service_id] = video_url
+
+    return paths
+
+
 def compute_and_cache_recommendations(
     db: Session,
     n_neighbors: int = 10,
@@ -184,15 +312,14 @@ def compute_and_cache_recommendations(
     logger.info(f"📅 Analyzing provisions from {cutoff_date.date()} to today")
 
     # Create computation log
-    log_entry = models.RecommendationComputationLog(
+    log_id = _create_computation_log(
+        db,
         n_neighbors=n_neighbors,
         top_n_services=top_n_services,
         min_provision_threshold=min_provision_threshold,
         triggered_by="api_precompute_optimized",
         status="running",
     )
-    db.add(log_entry)
-    db.commit()
 
     start_time = time.time()
 
@@ -200,54 +327,46 @@ def compute_and_cache_recommendations(
         # STEP 1: Fetch data with SLIDING WINDOW optimization
         logger.info("📊 Fetching data from database with date filter...")
 
+        # Rows come back as tuples from Core selects and are turned into
+        # DataFrames column-wise through Arrow (no ORM objects, no per-row dicts)
+        Bsk = models.BSKMaster
+        Prov = models.Provision
+
         # BSKs - small table, no filtering needed
-        bsks = db.query(models.BSKMaster).all()
-        bsks_df = pd.DataFrame(
-            [
-                {
-                    "bsk_id": b.bsk_id,
-                    "bsk_name": b.bsk_name,
-                    "bsk_code": b.bsk_code,
-                    "bsk_lat": b.bsk_lat,
-                    "bsk_long": b.bsk_long,
-                    "district_name": b.district_name,
-                    "block_municipalty_name": b.block_municipalty_name,
-                    "bsk_type": b.bsk_type,
-                }
-                for b in bsks
-            ]
+        bsks_df = _query_to_dataframe(
+            db,
+            select(
+                Bsk.bsk_id,
+                Bsk.bsk_name,
+                Bsk.bsk_code,
+                Bsk.bsk_lat,
+                Bsk.bsk_long,
+                Bsk.district_name,
+                Bsk.block_municipalty_name,
+                Bsk.bsk_type,
+            ),
         )
 
         # ✅ OPTIMIZATION: SLIDING WINDOW - Only fetch provisions from last N days
         # THIS IS THE KEY OPTIMIZATION!
-        # Since prov_date is stored as Text, we need to cast it to DATE for comparison
-        from sqlalchemy import cast, Date
-        
+        # Since prov_date is stored as Text, it is converted to DATE for comparison
+        # through dbo.prov_date_as_date, which has an expression index
+        # (models.PROVISION_INDEX_DDL), so the window is an index range scan
+        # Only the two columns the algorithm uses, streamed from a server-side cursor
+        provisions_stmt = select(Prov.bsk_id, Prov.service_id)
+
         try:
-            # Cast the text column to DATE type for proper comparison
-            provisions = (
-                db.query(models.Provision)
-                .filter(
-                    cast(models.Provision.prov_date, Date) >= cutoff_date.date()
-                )
-                .all()
+            provisions_df = _stream_to_dataframe(
+                db,
+                provisions_stmt.where(
+                    func.dbo.prov_date_as_date(Prov.prov_date) >= cutoff_date.date()
+                ),
             )
         except Exception as e:
             # If casting fails (e.g., invalid date formats), fall back to fetching all
             logger.warning(f"⚠️ Date filtering failed: {e}. Fetching all provisions...")
-            provisions = db.query(models.Provision).all()
-
-        provisions_df = pd.DataFrame(
-            [
-                {
-                    "bsk_id": p.bsk_id,
-                    "service_id": p.service_id,
-                    "customer_id": p.customer_id,
-                    "prov_date": p.prov_date,
-                }
-                for p in provisions
-            ]
-        )
+            db.rollback()
+            provisions_df = _stream_to_dataframe(db, provisions_stmt)
 
         # Log the optimization impact
         logger.info(
@@ -255,35 +374,23 @@ def compute_and_cache_recommendations(
             f"(instead of ALL provisions) - {lookback_days} day window"
         )
 
-        # Services - small table, no filtering needed
-        services = db.query(models.ServiceMaster).all()
-        services_df = pd.DataFrame(
-            [
-                {
-                    "service_id": s.service_id,
-                    "service_name": s.service_name,
-                    "service_type": s.service_type,
-                }
-                for s in services
-            ]
-        )
+        # Services - small table, no filtering needed (cached across runs)
+        services_df = _load_services(db)
 
         # DEOs - small table, no filtering needed
-        deos = db.query(models.DEOMaster).all()
-        deos_df = pd.DataFrame(
-            [
-                {
-                    "agent_id": d.agent_id,
-                    "user_name": d.user_name,
-                    "agent_code": d.agent_code,
-                    "agent_email": d.agent_email,
-                    "agent_phone": d.agent_phone,
-                    "bsk_id": d.bsk_id,
-                    "bsk_post": d.bsk_post,
-                    "is_active": d.is_active,
-                }
-                for d in deos
-            ]
+        Deo = models.DEOMaster
+        deos_df = _query_to_dataframe(
+            db,
+            select(
+                Deo.agent_id,
+                Deo.user_name,
+                Deo.agent_code,
+                Deo.agent_email,
+                Deo.agent_phone,
+                Deo.bsk_id,
+                Deo.bsk_post,
+                Deo.is_active,
+            ),
         )
 
         logger.info(
@@ -307,19 +414,28 @@ def compute_and_cache_recommendations(
 
         # STEP 3: Clear old cache and store new results
         logger.info("🗑️ Clearing old cache...")
-        db.query(models.TrainingRecommendationCache).delete()
-        db.commit()
+        cache_table = models.TrainingRecommendationCache.__table__
+        db.execute(cache_table.delete())
 
         logger.info("💾 Storing new provision computations in cache...")
+
+        # Per-BSK provision metrics in one aggregation (from filtered data),
+        # as one plain dict: bsk_id -> (total, unique services)
+        metrics = provisions_df.groupby("bsk_id", sort=False)["service_id"].agg(
+            total="size", unique="nunique"
+        )
+        metrics_by_bsk = dict(
+            zip(
+                metrics.index.tolist(),
+                zip(metrics["total"].tolist(), metrics["unique"].tolist()),
+            )
+        )
+
+        cache_rows = []
         for rec in recommendations:
             bsk_id = rec["bsk_id"]
 
-            # Calculate provision metrics for this BSK (from filtered data)
-            prov_data = provisions_df[provisions_df["bsk_id"] == bsk_id]
-            total_prov = len(prov_data)
-            unique_services = (
-                prov_data["service_id"].nunique() if len(prov_data) > 0 else 0
-            )
+            total_prov, unique_services = metrics_by_bsk.get(bsk_id, (0, 0))
 
             # Extract nearest BSKs - separate IDs and distances into parallel arrays
             nearest_bsks_raw = rec.get("nearest_bsks", [])
@@ -341,37 +457,49 @@ def compute_and_cache_recommendations(
                 recom_service_neigh_provs.append(s.get("total_provisions_in_area", 0))
 
             # Create optimized cache entry with list-based storage
-            cache_entry = models.TrainingRecommendationCache(
-                bsk_id=bsk_id,
-                # Provision metrics (from sliding window data)
-                total_provisions=total_prov,
-                unique_services_provided=unique_services,
-                priority_score=rec.get("priority_score", 0),
-                # Nearest BSKs - parallel arrays
-                nearest_bsks_id=nearest_bsk_ids,
-                distance_km=distances,
-                # Top services in neighborhood
-                neigh_top_services_id=top_services_in_area,
-                # Recommendations - parallel arrays
-                total_training_services=len(recom_services),
-                recom_service_id=recom_service_ids,
-                recom_service_prov=recom_service_provs,
-                recom_service_neigh_prov=recom_service_neigh_provs,
+            cache_rows.append(
+                {
+                    "bsk_id": bsk_id,
+                    # Provision metrics (from sliding window data)
+                    "total_provisions": total_prov,
+                    "unique_services_provided": unique_services,
+                    "priority_score": rec.get("priority_score", 0),
+                    # Nearest BSKs - parallel arrays
+                    "nearest_bsks_id": nearest_bsk_ids,
+                    "distance_km": distances,
+                    # Top services in neighborhood
+                    "neigh_top_services_id": top_services_in_area,
+                    # Recommendations - parallel arrays
+                    "total_training_services": len(recom_services),
+                    "recom_service_id": recom_service_ids,
+                    "recom_service_prov": recom_service_provs,
+                    "recom_service_neigh_prov": recom_service_neigh_provs,
+                }
             )
-            db.add(cache_entry)
 
+        # One multi-row INSERT, committed together with the DELETE above so
+        # readers never see an empty cache
+        if cache_rows:
+            # Core executemany: multi-row VALUES batches, no ORM bulk bookkeeping
+            db.execute(cache_table.insert(), cache_rows)
         db.commit()
         logger.info(f"✅ Cached {len(recommendations)} entries")
 
+        # Columnar snapshot of the same rows for fast reads (optional)
+        _write_recommendation_snapshot(db, cache_rows)
+
         # STEP 4: Update computation log with optimization metrics
         duration = time.time() - start_time
-        log_entry.completion_timestamp = datetime.now()
-        log_entry.computation_duration_seconds = duration
-        log_entry.status = "completed"
-        log_entry.total_bsks_analyzed = len(bsks_df)
-        log_entry.total_provisions_processed = len(provisions_df)
-        log_entry.total_recommendations_generated = len(recommendations)
-        db.commit()
+        _complete_computation_log(
+            db,
+            log_id,
+            completion_timestamp=datetime.now(),
+            computation_duration_seconds=duration,
+            status="completed",
+            total_bsks_analyzed=len(bsks_df),
+            total_provisions_processed=len(provisions_df),
+            total_recommendations_generated=len(recommendations),
+        )
 
         logger.info(
             f"✅ OPTIMIZED computation completed in {duration:.2f}s "
@@ -392,29 +520,158 @@ def compute_and_cache_recommendations(
 
     except Exception as e:
         # Log failure
-        log_entry.status = "failed"
-        log_entry.error_message = str(e)
-        log_entry.completion_timestamp = datetime.now()
-        log_entry.computation_duration_seconds = time.time() - start_time
-        db.commit()
+        db.rollback()
+        _complete_computation_log(
+            db,
+            log_id,
+            status="failed",
+            error_message=str(e),
+            completion_timestamp=datetime.now(),
+            computation_duration_seconds=time.time() - start_time,
+        )
 
         logger.error(f"❌ Computation failed: {e}")
         raise HTTPException(status_code=500, detail=f"Computation failed: {str(e)}")
 
 
+# Keep string columns Arrow-backed in pandas (compact buffers instead of one
+# Python object per cell); other types convert to the usual NumPy dtypes
+_ARROW_STRING_TYPES = {pa.string(): pd.ArrowDtype(pa.string())}.get
+
+
+def _as_text(value) -> str:
+    """str() of a cell; Arrow nulls (pd.NA) render as "None", like object columns"""
+    return str(None if value is pd.NA else value)
+
+
+def _write_recommendation_snapshot(db: Session, cache_rows: List[Dict]) -> None:
+    """
+    Persist the committed cache rows as a zstd Feather file.
+    Rows are stamped with the DB cache timestamp so readers can tell whether
+    the file belongs to the current cache generation.
+    """
+    try:
+        cache_timestamp = db.execute(
+            select(func.max(models.TrainingRecommendationCache.timestamp))
+        ).scalar()
+        table = pa.Table.from_pylist(
+            [{**row, "timestamp": cache_timestamp} for row in cache_rows]
+        )
+        tmp_path = f"{RECOMMENDATION_SNAPSHOT_PATH}.tmp"
+        feather.write_feather(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, RECOMMENDATION_SNAPSHOT_PATH)
+        logger.info(f"💾 Recommendation snapshot written to {RECOMMENDATION_SNAPSHOT_PATH}")
+    except Exception as e:
+        # The SQL cache is authoritative; readers fall back to it
+        logger.warning(f"⚠️ Could not write recommendation snapshot: {e}")
+
+
+_snapshot_state = {"mtime": None, "rows": []}
+
+
+def load_recommendation_snapshot(db: Session) -> Optional[List[SimpleNamespace]]:
+    """
+    Return the cached recommendation rows from the Feather snapshot, highest
+    priority first, or None if there is no snapshot for the current cache.
+
+    The file is read once per change (by mtime) and kept in memory. One scalar
+    query checks that it matches the latest cache timestamp in the DB, so a
+    stale or foreign snapshot is never served. Rows expose the same attributes
+    as TrainingRecommendationCache, so enrich_recommendation accepts them.
+    """
+    try:
+        mtime = os.stat(RECOMMENDATION_SNAPSHOT_PATH).st_mtime
+    except OSError:
+        return None
+
+    if _snapshot_state["mtime"] != mtime:
+        rows = [
+            SimpleNamespace(**row)
+            for row in feather.read_table(RECOMMENDATION_SNAPSHOT_PATH).to_pylist()
+        ]
+        rows.sort(key=lambda r: r.priority_score, reverse=True)
+        _snapshot_state.update(mtime=mtime, rows=rows)
+
+    rows = _snapshot_state["rows"]
+    cache_timestamp = db.execute(
+        select(func.max(models.TrainingRecommendationCache.timestamp))
+    ).scalar()
+    if not rows or cache_timestamp is None or rows[0].timestamp != cache_timestamp:
+        return None
+    return rows
+
+
+def _query_to_dataframe(db: Session, stmt) -> pd.DataFrame:
+    """Run a Core select and build the DataFrame column-wise via an Arrow RecordBatch."""
+    result = db.execute(stmt)
+    names = list(result.keys())
+    rows = result.all()
+    columns = zip(*rows) if rows else ([] for _ in names)
+    batch = pa.RecordBatch.from_arrays([pa.array(col) for col in columns], names=names)
+    return batch.to_pandas(types_mapper=_ARROW_STRING_TYPES)
+
+
+def _stream_to_dataframe(db: Session, stmt, chunk_size: int = 50_000) -> pd.DataFrame:
+    """
+    Like _query_to_dataframe, for large results: rows are streamed from a
+    server-side cursor in chunks of `chunk_size`, and each chunk is converted to
+    Arrow arrays straight away, so at most one chunk of row tuples is alive.
+    """
+    result = db.execute(stmt.execution_options(yield_per=chunk_size))
+    names = list(result.keys())
+    chunks = [[] for _ in names]
+    for partition in result.partitions():
+        for chunk, col in zip(chunks, zip(*partition)):
+            chunk.append(pa.array(col))
+
+    columns = []
+    for chunk in chunks:
+        # An all-NULL chunk infers as the null type; cast it to the column's type
+        col_type = next((a.type for a in chunk if a.type != pa.null()), pa.null())
+        columns.append(pa.chunked_array([a.cast(col_type) for a in chunk], type=col_type))
+    return pa.Table.from_arrays(columns, names=names).to_pandas()
+
+
+def _create_computation_log(db: Session, **values) -> int:
+    """Insert a computation log row via Core and return its log_id (no ORM flush/refresh)."""
+    log_table = models.RecommendationComputationLog.__table__
+    log_id = db.execute(
+        log_table.insert().values(**values).returning(log_table.c.log_id)
+    ).scalar_one()
+    db.commit()
+    return log_id
+
+
+def _complete_computation_log(db: Session, log_id: int, **values) -> None:
+    """Finalize a computation log row with a single Core UPDATE."""
+    log_table = models.RecommendationComputationLog.__table__
+    db.execute(
+        log_table.update().where(log_table.c.log_id == log_id).values(**values)
+    )
+    db.commit()
+
+
 # ============================================================================
 # REMAINING HELPER FUNCTIONS (UNCHANGED)
 # ============================================================================
 
 
+@njit(cache=True, fastmath=True)
 def haversine_distance(lat1, lon1, lat2, lon2):
     """
     Calculate the great circle distance between two points
     on the earth (specified in decimal degrees).
     Returns distance in kilometers.
+
+    JIT-compiled with Numba for scalar callers. The recommendation pipeline
+    no longer calls it: all_nearest_bsks gets neighbors and their distances
+    from one BallTree query.
     """
     # Convert decimal degrees to radians
-    lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
+    lat1 = np.radians(lat1)
+    lon1 = np.radians(lon1)
+    lat2 = np.radians(lat2)
+    lon2 = np.radians(lon2)
 
     # Haversine formula
     dlat = lat2 - lat1
@@ -427,87 +684,95 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     return c * r
 
 
-def find_nearest_bsks(
-    target_bsk_id: int, bsks_df: pd.DataFrame, n_neighbors: int = 10
-) -> List[int]:
+def all_nearest_bsks(
+    lats: np.ndarray, lons: np.ndarray, ids: np.ndarray, n_neighbors: int
+) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Find N nearest BSKs to a target BSK using geographic coordinates.
+    Find the N nearest BSKs for every BSK at once.
+
+    All BSKs go into a haversine BallTree, which is queried for every BSK in a
+    single call: O(N log N) in compiled code instead of N full distance scans.
+    No N x N distance matrix is built (O(N^2) memory); the returned distances
+    are reused for the nearby-BSK details, so nothing is recomputed.
 
     Args:
-        target_bsk_id: The BSK ID to find neighbors for
-        bsks_df: DataFrame with BSK data including lat/long
+        lats: BSK latitudes in radians
+        lons: BSK longitudes in radians
+        ids: BSK IDs, aligned with lats/lons
         n_neighbors: Number of nearest neighbors to find
 
     Returns:
-        List of nearest BSK IDs (excluding the target BSK itself)
+        (nearest BSK IDs, distances in km) as two (N, k) arrays whose rows
+        align with the inputs; nearest first, excluding the BSK itself.
+        Plain arrays (not a dict of rows) so worker processes get them
+        memory-mapped instead of pickled.
     """
-    # Get target BSK coordinates
-    target_bsk = bsks_df[bsks_df["bsk_id"] == target_bsk_id]
-    if target_bsk.empty:
-        return []
-
-    target_lat = float(target_bsk.iloc[0]["bsk_lat"])
-    target_lon = float(target_bsk.iloc[0]["bsk_long"])
+    k = max(min(n_neighbors, len(ids) - 1), 0)
+    if k == 0:
+        return ids[:0].reshape(len(ids), 0), np.empty((len(ids), 0))
 
-    # Calculate distances to all other BSKs
-    distances = []
-    for _, bsk in bsks_df.iterrows():
-        if bsk["bsk_id"] == target_bsk_id:
-            continue
+    coords = np.column_stack([lats, lons])
+    tree = BallTree(coords, metric="haversine")
+    # k + 1 because each BSK is returned as its own nearest point
+    dists, idxs = tree.query(coords, k=k + 1)
 
-        try:
-            lat = float(bsk["bsk_lat"])
-            lon = float(bsk["bsk_long"])
-            dist = haversine_distance(target_lat, target_lon, lat, lon)
-            distances.append({"bsk_id": int(bsk["bsk_id"]), "distance_km": dist})
-        except (ValueError, TypeError):
-            continue
-
-    # Sort by distance and get top N
-    distances.sort(key=lambda x: x["distance_km"])
-    nearest_ids = [d["bsk_id"] for d in distances[:n_neighbors]]
+    # Drop each BSK's own entry in one masked gather; where self tied at
+    # distance 0 beyond k+1, drop the farthest instead. Every row keeps k.
+    keep = idxs != np.arange(len(ids))[:, None]
+    keep[keep.all(axis=1), -1] = False
+    nearest_ids = ids[idxs[keep].reshape(-1, k)]
+    nearest_km = (dists[keep] * 6371).reshape(-1, k)
 
-    return nearest_ids
+    return nearest_ids, nearest_km
 
 
 def get_top_services_from_bsks(
     bsk_ids: List[int],
-    provisions_df: pd.DataFrame,
-    services_df: pd.DataFrame,
+    counts_matrix: csr_matrix,
+    bsk_id_to_row: Dict[int, int],
+    service_ids: np.ndarray,
+    services_lookup: Dict[int, Dict],
     top_n: int = 10,
 ) -> List[Dict]:
     """
     Find top services performed by a list of BSKs.
 
+    Works on the precomputed BSK x service count matrix from
+    training_recommendation: the BSKs' rows are summed instead of filtering
+    and grouping the provisions frame on every call.
+
     Args:
         bsk_ids: List of BSK IDs to analyze
-        provisions_df: DataFrame with provision data (filtered by date)
-        services_df: DataFrame with service details
+        counts_matrix: CSR provision counts (rows = BSKs, columns = services)
+        bsk_id_to_row: bsk_id -> row in counts_matrix
+        service_ids: Service ID for each column of counts_matrix
+        services_lookup: service_id -> service row dict, built once by the caller
         top_n: Number of top services to return
 
     Returns:
         List of top service dictionaries with counts
     """
-    # Filter provisions for these BSKs
-    bsk_provisions = provisions_df[provisions_df["bsk_id"].isin(bsk_ids)]
-
-    if bsk_provisions.empty:
+    rows = [bsk_id_to_row[b] for b in bsk_ids if b in bsk_id_to_row]
+    if not rows:
         return []
 
-    # Count services
-    service_counts = (
-        bsk_provisions.groupby("service_id").size().reset_index(name="total_provisions")
-    )
-    service_counts = service_counts.sort_values(
-        "total_provisions", ascending=False
-    ).head(top_n)
+    counts = np.asarray(counts_matrix[rows].sum(axis=0)).ravel()
 
-    # Add service details
-    services_lookup = services_df.set_index("service_id").to_dict("index")
+    # O(S) partial selection of the top_n counts, then order just those;
+    # only services these BSKs actually provided can make the list. Ties go
+    # to the lowest column (lowest service_id), as in the per-BSK kernel.
+    k = min(top_n, int(np.count_nonzero(counts)))
+    if k == 0:
+        return []
+    kth = np.partition(counts, len(counts) - k)[len(counts) - k]
+    above = np.flatnonzero(counts > kth)
+    tied = np.flatnonzero(counts == kth)[: k - len(above)]
+    top = np.concatenate([above, tied])
+    top = top[np.lexsort((top, -counts[top]))]
 
     top_services = []
-    for _, row in service_counts.iterrows():
-        service_id = int(row["service_id"])
+    for i in top:
+        service_id = int(service_ids[i])
         if service_id in services_lookup:
             service_info = services_lookup[service_id]
             top_services.append(
@@ -515,28 +780,234 @@ def get_top_services_from_bsks(
                     "service_id": service_id,
                     "service_name": str(service_info.get("service_name", "Unknown")),
                     "service_type": str(service_info.get("service_type", "N/A")),
-                    "total_provisions_in_area": int(row["total_provisions"]),
+                    "total_provisions_in_area": int(counts[i]),
                 }
             )
 
     return top_services
 
 
-def calculate_bsk_service_performance(
-    bsk_id: int, service_id: int, provisions_df: pd.DataFrame
-) -> int:
+@njit(parallel=True, cache=True)
+def _neighborhood_top_services(
+    indptr, indices, data, neighbor_rows, own_rows, n_services, top_n
+):
     """
-    Calculate how many times a BSK has provided a specific service.
+    Fused per-BSK kernel over the CSR provision counts.
+
+    For every BSK (in parallel) it sums the neighbor rows into per-service
+    totals, picks the top_n services by total (ties to the lowest column,
+    i.e. lowest service_id) and reads the BSK's own count for each of them.
+
+    Args:
+        indptr, indices, data: CSR arrays of the BSK x service count matrix
+        neighbor_rows: (n_bsks, k) matrix rows of each BSK's neighbors, -1 padded
+        own_rows: Matrix row of each BSK, -1 if it has no provisions
+        n_services: Number of matrix columns
+        top_n: Number of top services to select
 
-    Note: provisions_df is already filtered by date in the parent function.
+    Returns:
+        (top_cols, top_totals, own_counts), each (n_bsks, top_n); unused
+        slots have top_cols == -1 and come after the used ones
     """
-    count = len(
-        provisions_df[
-            (provisions_df["bsk_id"] == bsk_id)
-            & (provisions_df["service_id"] == service_id)
-        ]
-    )
-    return count
+    n = neighbor_rows.shape[0]
+    top_cols = np.full((n, top_n), -1, dtype=np.int64)
+    top_totals = np.zeros((n, top_n), dtype=np.int64)
+    own_counts = np.zeros((n, top_n), dtype=np.int64)
+
+    for b in prange(n):
+        totals = np.zeros(n_services, dtype=np.int64)
+        for j in range(neighbor_rows.shape[1]):
+            r = neighbor_rows[b, j]
+            if r >= 0:
+                for p in range(indptr[r], indptr[r + 1]):
+                    totals[indices[p]] += data[p]
+
+        own = np.zeros(n_services, dtype=np.int64)
+        r = own_rows[b]
+        if r >= 0:
+            for p in range(indptr[r], indptr[r + 1]):
+                own[indices[p]] += data[p]
+
+        # top_n is small: repeated max-scans beat sorting all services
+        for slot in range(top_n):
+            best = -1
+            best_total = 0
+            for c in range(n_services):
+                if totals[c] > best_total:
+                    best = c
+                    best_total = totals[c]
+            if best < 0:
+                break
+            top_cols[b, slot] = best
+            top_totals[b, slot] = best_total
+            own_counts[b, slot] = own[best]
+            totals[best] = 0
+
+    return top_cols, top_totals, own_counts
+
+
+def _recommend_for_bsks(bsks: pd.DataFrame, offset: int, shared: Dict) -> List[Dict]:
+    """
+    Loop body of training_recommendation for one chunk of BSKs.
+
+    Pure with respect to its inputs (nothing is written back to shared), so
+    chunks can run in separate worker processes. The numeric work is done by
+    _neighborhood_top_services plus a few array ops per chunk; dicts are only
+    built for BSKs that end up with recommendations.
+
+    Args:
+        bsks: Chunk of the prepared BSK frame
+        offset: Position of the chunk's first BSK in the full frame
+        shared: Read-only neighbor map, kernel outputs and lookup dicts
+
+    Returns:
+        Recommendations for the BSKs in this chunk, in input order
+    """
+    nearest_ids = shared["nearest_ids"]
+    nearest_km = shared["nearest_km"]
+    top_cols = shared["top_cols"]
+    top_totals = shared["top_totals"]
+    own_counts = shared["own_counts"]
+    matrix_service_ids = shared["matrix_service_ids"]
+    services_lookup = shared["services_lookup"]
+    deos_by_bsk = shared["deos_by_bsk"]
+    bsk_lookup = shared["bsk_lookup"]
+    n_neighbors = shared["n_neighbors"]
+    min_provision_threshold = shared["min_provision_threshold"]
+    recommendations = []
+
+    # Plain columns, converted to output types once and indexed positionally:
+    # no per-row casts or pandas calls in the loop. Coordinates are never
+    # null here (dropped during preparation).
+    def column(name):
+        if name in bsks:
+            return [_as_text(v) for v in bsks[name].tolist()]
+        return [""] * len(bsks)
+
+    ids = bsks["bsk_id"].to_numpy(dtype=np.int64).tolist()
+    lats = bsks["bsk_lat"].to_numpy(dtype=np.float64).tolist()
+    lons = bsks["bsk_long"].to_numpy(dtype=np.float64).tolist()
+    names = column("bsk_name")
+    codes = column("bsk_code")
+    districts = column("district_name")
+    blocks = column("block_municipalty_name")
+    bsk_types = column("bsk_type")
+
+    # Per matrix column: (service_id, name, type), or None if the service is
+    # missing from the services table
+    col_services = []
+    for service_id in matrix_service_ids.tolist():
+        info = services_lookup.get(service_id)
+        col_services.append(
+            None
+            if info is None
+            else (
+                int(service_id),
+                str(info.get("service_name", "Unknown")),
+                str(info.get("service_type", "N/A")),
+            )
+        )
+    known_col = np.array([c is not None for c in col_services] + [False])
+
+    # Kernel rows for this chunk as columnar (SoA) arrays; averages, gaps and
+    # the underperformance mask are computed for the whole chunk at once.
+    # Column -1 (unused slot) maps to the trailing False in known_col.
+    cols = top_cols[offset : offset + len(bsks)]
+    totals = top_totals[offset : offset + len(bsks)]
+    current = own_counts[offset : offset + len(bsks)]
+    known = known_col[cols]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg = totals / nearest_ids.shape[1]
+    gap = avg - current
+    underperforming = known & (current < min_provision_threshold)
+
+    # Only BSKs underperforming on at least one top service can get a
+    # recommendation (this implies they have neighbors with provisions)
+    for i in np.flatnonzero(underperforming.any(axis=1)).tolist():
+        bsk_id = ids[i]
+
+        # Find nearest BSKs
+        nearest_bsk_ids = nearest_ids[offset + i].tolist()
+
+        # Top services from nearby BSKs (known services only), then the
+        # ones this BSK underperforms on, highest gap first
+        top_slots = np.flatnonzero(known[i])
+        picked = np.flatnonzero(underperforming[i])
+        gaps = [round(g, 2) for g in gap[i, picked].tolist()]
+
+        recommended_services = []
+        for j in np.argsort(-np.asarray(gaps), kind="stable").tolist():
+            slot = picked[j]
+            service_id, service_name, service_type = col_services[cols[i, slot]]
+            current_provisions = int(current[i, slot])
+            total_in_area = int(totals[i, slot])
+            avg_provisions = float(avg[i, slot])
+
+            recommended_services.append(
+                {
+                    "service_id": service_id,
+                    "service_name": service_name,
+                    "service_type": service_type,
+                    "current_provisions": current_provisions,
+                    "nearby_avg_provisions": round(avg_provisions, 2),
+                    "gap": gaps[j],
+                    "total_provisions_in_area": total_in_area,
+                    "reason": _REASON_TMPL.format(
+                        nn=n_neighbors,
+                        avg=avg_provisions,
+                        name=service_name,
+                        cur=current_provisions,
+                        tot=total_in_area,
+                    ),
+                }
+            )
+
+        # Get DEO information
+        deo_details = list(deos_by_bsk.get(bsk_id, []))
+
+        # Get nearby BSK info (distances come from the BallTree query)
+        nearby_bsks_info = []
+        for nearby_id, dist_km in zip(nearest_bsk_ids, nearest_km[offset + i].tolist()):
+            nearby = bsk_lookup.get(nearby_id)
+            if nearby is not None:
+                nearby_bsks_info.append(
+                    {
+                        "bsk_id": int(nearby_id),
+                        "bsk_name": nearby[0],
+                        "bsk_code": nearby[1],
+                        "distance_km": round(dist_km, 2),
+                    }
+                )
+
+        # Create recommendation
+        recommendation = {
+            "bsk_id": bsk_id,
+            "bsk_name": names[i],
+            "bsk_code": codes[i],
+            "district_name": districts[i],
+            "block_municipalty_name": blocks[i],
+            "bsk_type": bsk_types[i],
+            "bsk_lat": lats[i],
+            "bsk_long": lons[i],
+            "nearest_bsks": nearby_bsks_info,
+            "nearest_bsk_ids": [int(x) for x in nearest_bsk_ids],
+            "top_services_in_area": [
+                col_services[c][0] for c in cols[i, top_slots].tolist()
+            ],
+            "total_training_services": len(recommended_services),
+            "recommended_services": recommended_services,
+            "deos": deo_details,
+            "priority_score": sum(gaps),
+            "analysis_metadata": {
+                "n_neighbors_analyzed": len(nearest_bsk_ids),
+                "top_n_services_considered": len(top_slots),
+                "analysis_timestamp": datetime.now().isoformat(),
+            },
+        }
+
+        recommendations.append(recommendation)
+
+    return recommendations
 
 
 def training_recommendation(
@@ -547,6 +1018,7 @@ def training_recommendation(
     n_neighbors: int = 5,
     top_n_services: int = 10,
     min_provision_threshold: int = 5,
+    n_jobs: int = -1,
 ) -> List[Dict]:
     """
     Generate training recommendations based on nearest BSK analysis.
@@ -568,6 +1040,12 @@ def training_recommendation(
         n_neighbors: Number of nearby BSKs to analyze
         top_n_services: Number of top services to consider
         min_provision_threshold: Minimum provisions to not need training
+        n_jobs: Worker processes for the per-BSK loop (-1 = all cores)
+
+    Note:
+        bsks_df and provisions_df are consumed: their ID/coordinate columns
+        are coerced to numeric in place instead of on a copy, which would
+        double peak memory for the provisions frame.
 
     Returns:
         List of training recommendations with detailed reasoning
@@ -577,7 +1055,7 @@ def training_recommendation(
 
     # Prepare BSK data
     print("[1/5] Preparing BSK data...")
-    bsks = bsks_df.copy()
+    bsks = bsks_df
     bsks["bsk_id"] = pd.to_numeric(bsks["bsk_id"], errors="coerce")
     bsks["bsk_lat"] = pd.to_numeric(bsks["bsk_lat"], errors="coerce")
     bsks["bsk_long"] = pd.to_numeric(bsks["bsk_long"], errors="coerce")
@@ -589,168 +1067,132 @@ def training_recommendation(
 
     print(f"   ✓ {len(bsks)} valid BSKs loaded")
 
+    # Nearest neighbors for every BSK, computed once up front
+    nearest_ids, nearest_km = all_nearest_bsks(
+        np.radians(bsks["bsk_lat"].to_numpy(dtype=float)),
+        np.radians(bsks["bsk_long"].to_numpy(dtype=float)),
+        bsks["bsk_id"].to_numpy().astype(int),
+        n_neighbors,
+    )
+
     # Prepare provisions data (already filtered by parent function)
     print("[2/5] Preparing provisions data...")
-    prov = provisions_df.copy()
+    prov = provisions_df
     prov["bsk_id"] = pd.to_numeric(prov["bsk_id"], errors="coerce")
     prov["service_id"] = pd.to_numeric(prov["service_id"], errors="coerce")
-    prov = prov.dropna(subset=["bsk_id", "service_id"])
+    # dropna always copies; skip it when there is nothing to drop
+    if prov[["bsk_id", "service_id"]].isna().any(axis=None):
+        prov = prov.dropna(subset=["bsk_id", "service_id"])
     print(f"   ✓ {len(prov)} provision records loaded")
 
+    # (bsk_id, service_id) provision counts as a sparse BSK x service CSR
+    # matrix (most BSKs provide few of the services): a neighborhood's
+    # per-service totals are then a sum over a few short CSR rows instead of
+    # a filter + groupby. Duplicate (row, col) entries are summed on
+    # construction. Categoricals give compact int8/16/32 codes (not int64)
+    # and sorted categories keep service_ids ascending.
+    bsk_cat = prov["bsk_id"].astype("category").cat
+    service_cat = prov["service_id"].astype("category").cat
+    matrix_bsk_ids = bsk_cat.categories
+    matrix_service_ids = np.asarray(service_cat.categories)
+    counts_matrix = csr_matrix(
+        (
+            np.ones(len(prov), dtype=np.int64),
+            (bsk_cat.codes.to_numpy(), service_cat.codes.to_numpy()),
+        ),
+        shape=(len(matrix_bsk_ids), len(matrix_service_ids)),
+    )
+    services_lookup = services_df.set_index("service_id").to_dict("index")
+
     # Prepare DEOs lookup
     print("[3/5] Preparing DEO data...")
-    deos_by_bsk = (
-        deos_df.groupby("bsk_id").apply(lambda x: x.to_dict("records")).to_dict()
-    )
+    # Bucketed in one pass, already in output form, so a BSK's DEO details
+    # are a single lookup in the per-BSK loop
+    deos_by_bsk = {}
+    for deo_row in deos_df.to_dict("records"):
+        deos_by_bsk.setdefault(deo_row.get("bsk_id"), []).append(
+            {
+                "agent_id": str(deo_row.get("agent_id", "")),
+                "user_name": str(deo_row.get("user_name", "")),
+                "agent_code": str(deo_row.get("agent_code", "")),
+                "agent_email": str(deo_row.get("agent_email", "")),
+                "agent_phone": str(deo_row.get("agent_phone", "")),
+                "bsk_post": str(deo_row.get("bsk_post", "")),
+                "is_active": bool(deo_row.get("is_active", False)),
+            }
+        )
 
     # Generate recommendations
     print("[4/5] Analyzing BSK neighborhoods and generating recommendations...")
     recommendations = []
 
-    for idx, bsk_row in bsks.iterrows():
-        bsk_id = int(bsk_row["bsk_id"])
-
-        # Find nearest BSKs
-        nearest_bsk_ids = find_nearest_bsks(bsk_id, bsks, n_neighbors)
-
-        if not nearest_bsk_ids:
-            continue
+    # Neighbor and own matrix rows per BSK (-1 = no provisions), resolved in
+    # one vectorized hash lookup, then one compiled pass for neighborhood
+    # totals, top services and own counts
+    matrix_rows = pd.Index(matrix_bsk_ids)
+    neighbor_rows = matrix_rows.get_indexer(nearest_ids.ravel()).reshape(
+        nearest_ids.shape
+    ).astype(np.int64)
+    own_rows = matrix_rows.get_indexer(bsks["bsk_id"].to_numpy()).astype(np.int64)
+    top_cols, top_totals, own_counts = _neighborhood_top_services(
+        counts_matrix.indptr,
+        counts_matrix.indices,
+        counts_matrix.data,
+        neighbor_rows,
+        own_rows,
+        len(matrix_service_ids),
+        top_n_services,
+    )
 
-        # Get top services from nearby BSKs (using filtered provisions)
-        top_services = get_top_services_from_bsks(
-            nearest_bsk_ids, prov, services_df, top_n_services
+    # One O(1) lookup per neighbor: bsk_id -> (name, code), already as strings
+    bsk_lookup = {
+        int(bsk_id): (_as_text(name), _as_text(code))
+        for bsk_id, name, code in zip(
+            bsks["bsk_id"].tolist(), bsks["bsk_name"].tolist(), bsks["bsk_code"].tolist()
         )
+    }
 
-        if not top_services:
-            continue
-
-        # Check performance on each top service
-        recommended_services = []
-
-        for service in top_services:
-            service_id = service["service_id"]
-
-            # Get current BSK's performance (from filtered data)
-            current_provisions = calculate_bsk_service_performance(
-                bsk_id, service_id, prov
-            )
-
-            # Calculate average for nearby BSKs (from filtered data)
-            nearby_provisions = prov[
-                (prov["bsk_id"].isin(nearest_bsk_ids))
-                & (prov["service_id"] == service_id)
-            ]
-            avg_provisions = (
-                len(nearby_provisions) / len(nearest_bsk_ids) if nearest_bsk_ids else 0
-            )
-
-            # If underperforming, add to recommendations
-            if current_provisions < min_provision_threshold:
-                gap = avg_provisions - current_provisions
-
-                recommended_services.append(
-                    {
-                        "service_id": service_id,
-                        "service_name": service["service_name"],
-                        "service_type": service["service_type"],
-                        "current_provisions": int(current_provisions),
-                        "nearby_avg_provisions": round(float(avg_provisions), 2),
-                        "gap": round(float(gap), 2),
-                        "total_provisions_in_area": service["total_provisions_in_area"],
-                        "reason": (
-                            f"Nearby BSKs (within {n_neighbors} nearest) are performing "
-                            f"{avg_provisions:.1f} provisions on average for '{service['service_name']}', "
-                            f"while this BSK has only {current_provisions} provisions. "
-                            f"This service is highly demanded in the area ({service['total_provisions_in_area']} "
-                            f"total provisions in neighborhood)."
-                        ),
-                    }
-                )
-
-        if recommended_services:
-            # Get DEO information
-            bsk_deos = deos_by_bsk.get(bsk_id, [])
-            deo_details = []
-
-            for deo_row in bsk_deos:
-                deo_details.append(
-                    {
-                        "agent_id": str(deo_row.get("agent_id", "")),
-                        "user_name": str(deo_row.get("user_name", "")),
-                        "agent_code": str(deo_row.get("agent_code", "")),
-                        "agent_email": str(deo_row.get("agent_email", "")),
-                        "agent_phone": str(deo_row.get("agent_phone", "")),
-                        "bsk_post": str(deo_row.get("bsk_post", "")),
-                        "is_active": bool(deo_row.get("is_active", False)),
-                    }
-                )
-
-            # Get nearby BSK info
-            nearby_bsks_info = []
-            for nearby_id in nearest_bsk_ids:
-                nearby_bsk = bsks[bsks["bsk_id"] == nearby_id]
-                if not nearby_bsk.empty:
-                    nearby_bsks_info.append(
-                        {
-                            "bsk_id": int(nearby_id),
-                            "bsk_name": str(nearby_bsk.iloc[0]["bsk_name"]),
-                            "bsk_code": str(nearby_bsk.iloc[0]["bsk_code"]),
-                            "distance_km": round(
-                                haversine_distance(
-                                    float(bsk_row["bsk_lat"]),
-                                    float(bsk_row["bsk_long"]),
-                                    float(nearby_bsk.iloc[0]["bsk_lat"]),
-                                    float(nearby_bsk.iloc[0]["bsk_long"]),
-                                ),
-                                2,
-                            ),
-                        }
-                    )
-
-            # Create recommendation
-            recommendation = {
-                "bsk_id": int(bsk_id),
-                "bsk_name": str(bsk_row.get("bsk_name", "")),
-                "bsk_code": str(bsk_row.get("bsk_code", "")),
-                "district_name": str(bsk_row.get("district_name", "")),
-                "block_municipalty_name": str(
-                    bsk_row.get("block_municipalty_name", "")
-                ),
-                "bsk_type": str(bsk_row.get("bsk_type", "")),
-                "bsk_lat": (
-                    float(bsk_row["bsk_lat"]) if pd.notna(bsk_row["bsk_lat"]) else None
-                ),
-                "bsk_long": (
-                    float(bsk_row["bsk_long"])
-                    if pd.notna(bsk_row["bsk_long"])
-                    else None
-                ),
-                "nearest_bsks": nearby_bsks_info,
-                "nearest_bsk_ids": [int(x) for x in nearest_bsk_ids],
-                "top_services_in_area": [s["service_id"] for s in top_services],
-                "total_training_services": len(recommended_services),
-                "recommended_services": sorted(
-                    recommended_services, key=lambda x: x["gap"], reverse=True
-                ),
-                "deos": deo_details,
-                "priority_score": sum(s["gap"] for s in recommended_services),
-                "analysis_metadata": {
-                    "n_neighbors_analyzed": len(nearest_bsk_ids),
-                    "top_n_services_considered": len(top_services),
-                    "analysis_timestamp": datetime.now().isoformat(),
-                },
-            }
-
-            recommendations.append(recommendation)
-
-        # Progress indicator
-        if (idx + 1) % 100 == 0:
-            print(f"   Processed {idx + 1}/{len(bsks)} BSKs...")
+    shared = {
+        "nearest_ids": nearest_ids,
+        "nearest_km": nearest_km,
+        "top_cols": top_cols,
+        "top_totals": top_totals,
+        "own_counts": own_counts,
+        "matrix_service_ids": matrix_service_ids,
+        "services_lookup": services_lookup,
+        "deos_by_bsk": deos_by_bsk,
+        "bsk_lookup": bsk_lookup,
+        "n_neighbors": n_neighbors,
+        "min_provision_threshold": min_provision_threshold,
+    }
 
-    # Sort by priority
-    recommendations = sorted(
-        recommendations, key=lambda x: x["priority_score"], reverse=True
+    # Per-BSK work is independent: split into chunks and fan out over CPU
+    # cores (loky processes; the neighbor and kernel arrays in `shared` are
+    # memory-mapped by joblib rather than pickled per chunk).
+    # Small inputs stay in-process, where worker startup would dominate.
+    n_workers = effective_n_jobs(n_jobs)
+    if n_workers == 1 or len(bsks) < PARALLEL_MIN_BSKS:
+        chunk_results = [_recommend_for_bsks(bsks, 0, shared)]
+    else:
+        bounds = np.linspace(0, len(bsks), n_workers * 4 + 1, dtype=int)
+        chunk_results = Parallel(n_jobs=n_workers, backend="loky")(
+            delayed(_recommend_for_bsks)(bsks.iloc[lo:hi], lo, shared)
+            for lo, hi in zip(bounds[:-1], bounds[1:])
+            if hi > lo
+        )
+    for chunk in chunk_results:
+        recommendations.extend(chunk)
+    print(f"   Processed {len(bsks)}/{len(bsks)} BSKs...")
+
+    # Sort by priority (stable, highest first): one argsort over the scores
+    scores = np.fromiter(
+        (r["priority_score"] for r in recommendations),
+        dtype=np.float64,
+        count=len(recommendations),
     )
+    recommendations = [
+        recommendations[i] for i in np.argsort(-scores, kind="stable").tolist()
+    ]
 
     print(f"✅ Generated {len(recommendations)} training recommendations")
 
@@ -760,8 +1202,15 @@ def training_recommendation(
 def export_recommendations_json(
     recommendations: List[Dict], filepath: str = "training_recommendations.json"
 ):
-    """Export recommendations to JSON file."""
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(recommendations, f, indent=2, ensure_ascii=False)
+    """Export recommendations to JSON file (orjson: UTF-8, 2-space indent)."""
+    with open(filepath, "wb") as f:
+        f.write(
+            orjson.dumps(
+                recommendations,
+                option=orjson.OPT_INDENT_2
+                | orjson.OPT_SERIALIZE_NUMPY
+                | orjson.OPT_NON_STR_KEYS,
+            )
+        )
 
     print(f"💾 Training recommendations exported to {filepath}")
\ No newline at end of file
@@ -22,11 +22,16 @@ videos/
       └── v1.mp4 (latest - KEEP)
 """
 
+import heapq
 import os
 import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from datetime import datetime
+from typing import Iterable, List, Dict, NamedTuple, Optional, Set, Tuple
 import logging
 from sqlalchemy.orm import Session
 
@@ -45,6 +50,16 @@ DEFAULT_RETENTION_DAYS = 15  # Keep videos for 30 days
 KEEP_LATEST_N_VERSIONS = 2  # Always keep latest 2 versions per service
 MIN_FREE_SPACE_GB = 10  # Minimum free space to maintain (GB)
 
+# Service directories are scanned on a thread pool (stat releases the GIL)
+# once there are more than this many of them
+PARALLEL_SCAN_MIN_SERVICES = 4
+SCAN_MAX_WORKERS = 32
+
+# Deletions (one unlink each) run on a thread pool; emergency cleanup
+# deletes in batches so it can stop once the target is reached
+DELETE_MAX_WORKERS = 16
+EMERGENCY_DELETE_BATCH = 32
+
 # Setup logging
 logger = logging.getLogger(__name__)
 
@@ -53,25 +68,74 @@ logger = logging.getLogger(__name__)
 # ============================================================================
 
 
-def get_directory_size(path: Path) -> int:
+def _scan_tree(
+    path: str, executor: Optional[ThreadPoolExecutor] = None
+) -> Tuple[int, int, Optional[float], Optional[float]]:
     """
-    Calculate total size of directory in bytes
+    Walk a directory tree once with os.scandir (DirEntry caches file type
+    and stat results, so each file costs at most one stat call)
 
     Args:
         path: Directory path
+        executor: If given, the subdirectories of path are walked on it
+            concurrently (stat releases the GIL)
 
     Returns:
-        Size in bytes
+        (total size of all files in bytes, number of .mp4 videos,
+         oldest video mtime, newest video mtime)
     """
     total_size = 0
-    try:
-        for item in path.rglob("*"):
-            if item.is_file():
-                total_size += item.stat().st_size
-    except Exception as e:
-        logger.error(f"Error calculating directory size: {e}")
+    video_count = 0
+    oldest = newest = None
+    subdirs = []
+
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file():
+                stat = entry.stat()
+                total_size += stat.st_size
+                if entry.name.endswith(".mp4"):
+                    video_count += 1
+                    mtime = stat.st_mtime
+                    if oldest is None or mtime < oldest:
+                        oldest = mtime
+                    if newest is None or mtime > newest:
+                        newest = mtime
+
+    scans = executor.map(_scan_tree, subdirs) if executor else map(_scan_tree, subdirs)
+    for size, count, sub_oldest, sub_newest in scans:
+        total_size += size
+        video_count += count
+        if count:
+            if oldest is None or sub_oldest < oldest:
+                oldest = sub_oldest
+            if newest is None or sub_newest > newest:
+                newest = sub_newest
+
+    return total_size, video_count, oldest, newest
+
+
+# Free-space lookup for this platform, chosen once at import
+if sys.platform == "win32":
+    import ctypes
+
+    _get_disk_free_space = ctypes.windll.kernel32.GetDiskFreeSpaceExW
+
+    def _free_bytes(path: Path) -> int:
+        free_bytes = ctypes.c_ulonglong(0)
+        _get_disk_free_space(
+            ctypes.c_wchar_p(str(path)), None, None, ctypes.pointer(free_bytes)
+        )
+        return free_bytes.value
 
-    return total_size
+else:
+
+    def _free_bytes(path: Path) -> int:
+        # Unix/Linux
+        stat = os.statvfs(path)
+        return stat.f_bavail * stat.f_frsize
 
 
 def get_free_space_gb(path: Path) -> float:
@@ -85,21 +149,7 @@ def get_free_space_gb(path: Path) -> float:
         Free space in GB
     """
     try:
-        import platform
-
-        if platform.system() == "Windows":
-            import ctypes
-
-            free_bytes = ctypes.c_ulonglong(0)
-            ctypes.windll.kernel32.GetDiskFreeSpaceExW(
-                ctypes.c_wchar_p(str(path)), None, None, ctypes.pointer(free_bytes)
-            )
-            return free_bytes.value / (1024**3)  # Convert to GB
-        else:
-            # Unix/Linux
-            stat = os.statvfs(path)
-            free_bytes = stat.f_bavail * stat.f_frsize
-            return free_bytes / (1024**3)  # Convert to GB
+        return _free_bytes(path) / (1024**3)  # Convert to GB
     except Exception as e:
         logger.error(f"Error getting free space: {e}")
         return 0
@@ -112,7 +162,12 @@ def analyze_video_storage() -> Dict:
     Returns:
         Dictionary with storage statistics
     """
-    if not VIDEO_BASE_DIR.exists():
+    # The base directory is created at import by the video generation
+    # helper, so a missing directory is handled as an exception
+    try:
+        with os.scandir(VIDEO_BASE_DIR) as entries:
+            services_count = sum(1 for entry in entries if entry.is_dir())
+    except FileNotFoundError:
         return {
             "total_size_mb": 0,
             "total_videos": 0,
@@ -122,21 +177,30 @@ def analyze_video_storage() -> Dict:
             "newest_video_date": None,
         }
 
-    total_size = get_directory_size(VIDEO_BASE_DIR)
-    total_videos = sum(1 for _ in VIDEO_BASE_DIR.rglob("*.mp4"))
-    services_count = sum(1 for item in VIDEO_BASE_DIR.iterdir() if item.is_dir())
+    # Size, video count and oldest/newest mtime in a single pass
+    # (service directories walked concurrently when there are enough)
+    total_size, total_videos, oldest_mtime, newest_mtime = 0, 0, None, None
+    try:
+        if services_count > PARALLEL_SCAN_MIN_SERVICES:
+            with ThreadPoolExecutor(
+                max_workers=min(SCAN_MAX_WORKERS, services_count)
+            ) as executor:
+                scan = _scan_tree(VIDEO_BASE_DIR, executor)
+        else:
+            scan = _scan_tree(VIDEO_BASE_DIR)
+        total_size, total_videos, oldest_mtime, newest_mtime = scan
+    except Exception as e:
+        logger.error(f"Error calculating directory size: {e}")
+
     free_space = get_free_space_gb(VIDEO_BASE_DIR)
 
     # Find oldest and newest videos
-    video_files = list(VIDEO_BASE_DIR.rglob("*.mp4"))
     oldest_date = None
     newest_date = None
 
-    if video_files:
-        oldest_file = min(video_files, key=lambda f: f.stat().st_mtime)
-        newest_file = max(video_files, key=lambda f: f.stat().st_mtime)
-        oldest_date = datetime.fromtimestamp(oldest_file.stat().st_mtime)
-        newest_date = datetime.fromtimestamp(newest_file.stat().st_mtime)
+    if total_videos:
+        oldest_date = datetime.fromtimestamp(oldest_mtime)
+        newest_date = datetime.fromtimestamp(newest_mtime)
 
     return {
         "total_size_mb": total_size / (1024 * 1024),
@@ -153,47 +217,119 @@ def analyze_video_storage() -> Dict:
 # ============================================================================
 
 
-def get_service_videos(service_dir: Path) -> List[Dict]:
+class ScannedVideo(NamedTuple):
+    """Raw stat values of a video file, as collected by get_service_videos"""
+
+    mtime: float
+    size_bytes: int
+    ctime: float
+    path: str
+    name: str
+
+    @property
+    def version(self) -> str:
+        return self.name[:-4]  # e.g., "v1", "v2"
+
+
+def get_service_videos(service_dir: Path, protected: int = 0) -> List[ScannedVideo]:
     """
-    Get all videos for a service with metadata
+    Get all videos for a service with their raw stat values
 
     Args:
         service_dir: Service directory path
+        protected: Number of latest videos that are always kept; a directory
+            with no more videos than this is skipped without any stat calls
 
     Returns:
-        List of video info dictionaries
+        List of scanned videos, newest first (empty if skipped)
     """
     videos = []
 
-    if not service_dir.exists() or not service_dir.is_dir():
+    try:
+        entries = os.scandir(service_dir)
+    except (FileNotFoundError, NotADirectoryError):
+        return videos
+
+    # Directory entries carry the name, so videos can be counted before
+    # any stat call
+    with entries:
+        video_entries = [entry for entry in entries if entry.name.endswith(".mp4")]
+
+    if len(video_entries) <= protected:
         return videos
 
-    for video_file in service_dir.glob("*.mp4"):
+    append = videos.append
+    for entry in video_entries:
         try:
-            stat = video_file.stat()
-
-            videos.append(
-                {
-                    "path": video_file,
-                    "name": video_file.name,
-                    "size_mb": stat.st_size / (1024 * 1024),
-                    "created_date": datetime.fromtimestamp(stat.st_ctime),
-                    "modified_date": datetime.fromtimestamp(stat.st_mtime),
-                    "age_days": (
-                        datetime.now() - datetime.fromtimestamp(stat.st_mtime)
-                    ).days,
-                    "version": video_file.stem,  # e.g., "v1", "v2"
-                }
+            stat = entry.stat()
+            append(
+                ScannedVideo(
+                    stat.st_mtime, stat.st_size, stat.st_ctime, entry.path, entry.name
+                )
             )
         except Exception as e:
-            logger.error(f"Error processing video {video_file}: {e}")
+            logger.error(f"Error processing video {entry.path}: {e}")
 
-    # Sort by modified date (newest first)
-    videos.sort(key=lambda x: x["modified_date"], reverse=True)
+    # Sort by modified time (newest first)
+    videos.sort(reverse=True)
 
     return videos
 
 
+def _video_details(video: ScannedVideo, now: datetime) -> Dict:
+    """
+    Build the video info dictionary for a scanned video. Only done for
+    videos that are reported or deleted, not for every scanned file.
+
+    Args:
+        video: Scanned video from get_service_videos
+        now: Reference time for the age
+
+    Returns:
+        Video info dictionary
+    """
+    modified_date = datetime.fromtimestamp(video.mtime)
+    return {
+        "path": Path(video.path),
+        "name": video.name,
+        "version": video.version,
+        "size_mb": video.size_bytes / (1024 * 1024),
+        "size_bytes": video.size_bytes,
+        "created_date": datetime.fromtimestamp(video.ctime),
+        "modified_date": modified_date,
+        "age_days": (now - modified_date).days,
+    }
+
+
+def _scan_services(protected: int = 0) -> List[Tuple[Path, List[ScannedVideo]]]:
+    """
+    Get the videos of every service directory, scanning directories
+    concurrently when there are enough of them
+
+    Args:
+        protected: Number of latest videos always kept per service
+
+    Returns:
+        List of (service_dir, videos) in directory listing order
+    """
+    with os.scandir(VIDEO_BASE_DIR) as entries:
+        service_dirs = [Path(entry.path) for entry in entries if entry.is_dir()]
+
+    if len(service_dirs) <= PARALLEL_SCAN_MIN_SERVICES:
+        return [
+            (service_dir, get_service_videos(service_dir, protected))
+            for service_dir in service_dirs
+        ]
+
+    with ThreadPoolExecutor(
+        max_workers=min(SCAN_MAX_WORKERS, len(service_dirs))
+    ) as executor:
+        scans = executor.map(
+            partial(get_service_videos, protected=protected), service_dirs
+        )
+        return list(zip(service_dirs, scans))
+
+
 def identify_deletable_videos(
     retention_days: int = DEFAULT_RETENTION_DAYS,
     keep_latest_n: int = KEEP_LATEST_N_VERSIONS,
@@ -217,50 +353,56 @@ def identify_deletable_videos(
     """
     deletable = []
 
-    if not VIDEO_BASE_DIR.exists():
+    try:
+        scanned = _scan_services(protected=keep_latest_n)
+    except FileNotFoundError:
         return deletable
 
-    cutoff_date = datetime.now() - timedelta(days=retention_days)
-
-    # Process each service directory
-    for service_dir in VIDEO_BASE_DIR.iterdir():
-        if not service_dir.is_dir():
-            continue
+    now = datetime.now()
+    cutoff_ts = time.time() - retention_days * 86400
 
+    # Collect old, unprotected videos across all services first
+    candidates = []
+    for service_dir, videos in scanned:
         service_name = service_dir.name
-        videos = get_service_videos(service_dir)
 
-        logger.debug(f"📁 Service '{service_name}': {len(videos)} videos found")
+        logger.debug(f"📁 Service '{service_name}': {len(videos)} videos scanned")
 
-        # Always keep the latest N versions
-        protected_videos = videos[:keep_latest_n]
-        candidate_videos = videos[keep_latest_n:]
-
-        for video in candidate_videos:
+        # Always keep the latest N versions. Videos are newest first, so
+        # once one is past the cutoff, all the remaining ones are too.
+        for position in range(keep_latest_n, len(videos)):
             # Check age
-            if video["modified_date"] < cutoff_date:
-                # Check database reference (optional)
-                is_referenced = False
-
-                if db:
-                    is_referenced = check_video_in_database(
-                        db, service_name, video["version"]
-                    )
-
-                if not is_referenced:
-                    deletable.append(
-                        {
-                            **video,
-                            "service_name": service_name,
-                            "reason": f"Older than {retention_days} days",
-                            "can_delete": True,
-                        }
-                    )
-                else:
-                    logger.info(
-                        f"⚠️  Video {service_name}/{video['name']} is old but "
-                        f"still referenced in database - keeping"
-                    )
+            if videos[position].mtime < cutoff_ts:
+                candidates.extend((service_name, video) for video in videos[position:])
+                break
+
+    # Check database references (optional) against the set of active
+    # service videos, loaded in a single query
+    referenced = set()
+    if db and candidates:
+        referenced = get_active_videos(db)
+
+    append = deletable.append
+    reason = f"Older than {retention_days} days"
+    for service_name, video in candidates:
+        is_referenced = (
+            referenced is None or (service_name, video.version) in referenced
+        )
+
+        if not is_referenced:
+            append(
+                {
+                    **_video_details(video, now),
+                    "service_name": service_name,
+                    "reason": reason,
+                    "can_delete": True,
+                }
+            )
+        else:
+            logger.info(
+                f"⚠️  Video {service_name}/{video.name} is old but "
+                f"still referenced in database - keeping"
+            )
 
     # Sort by age (oldest first)
     deletable.sort(key=lambda x: x["modified_date"])
@@ -268,42 +410,35 @@ def identify_deletable_videos(
     return deletable
 
 
-def check_video_in_database(db: Session, service_name: str, version: str) -> bool:
+def get_active_videos(db: Session) -> Optional[Set[Tuple[str, str]]]:
     """
-    Check if video is referenced in database as active
+    Get all videos referenced in database as active, in one query
 
     Args:
         db: Database session
-        service_name: Service name
-        version: Version string (e.g., "v1")
 
     Returns:
-        True if video is referenced and should be kept
+        Set of (service folder, version) pairs that should be kept, or None
+        if the database check failed
     """
     try:
-        # Check in training_video_logs table
-        video_log = (
-            db.query(models.TrainingVideoLog)
-            .filter(
-                models.TrainingVideoLog.service_name == service_name,
-                models.TrainingVideoLog.version == version,
-            )
-            .first()
+        # service_videos.video_path is videos/<service folder>/<version>.mp4
+        # (absolute or relative), matching the files found by the scan
+        rows = (
+            db.query(models.ServiceVideo.video_path)
+            .filter(models.ServiceVideo.is_active == True)
+            .all()
         )
-
-        # If exists and is recent (within last 7 days), consider it active
-        if video_log:
-            if video_log.generated_at:
-                age_days = (datetime.now() - video_log.generated_at).days
-                if age_days <= 7:
-                    return True
-
-        return False
+        active = set()
+        for (video_path,) in rows:
+            path = Path(video_path)
+            active.add((path.parent.name, path.stem))
+        return active
 
     except Exception as e:
         logger.error(f"Error checking database: {e}")
         # If database check fails, err on the side of caution
-        return True
+        return None
 
 
 # ============================================================================
@@ -353,22 +488,60 @@ def delete_video_safely(video_info: Dict, dry_run: bool = False) -> bool:
         return False
 
 
-def delete_empty_service_dirs():
+def _delete_videos(videos: List[Dict], dry_run: bool = False) -> List[bool]:
+    """
+    Delete videos concurrently (each unlink is an I/O-bound syscall), with
+    at most DELETE_MAX_WORKERS deletions in flight
+
+    Args:
+        videos: Video information dictionaries
+        dry_run: If True, only log what would be deleted
+
+    Returns:
+        Success flag per video, in input order
+    """
+    delete = partial(delete_video_safely, dry_run=dry_run)
+
+    # Dry runs only log, and a single file gains nothing from threads
+    if dry_run or len(videos) <= 1:
+        return [delete(video) for video in videos]
+
+    with ThreadPoolExecutor(
+        max_workers=min(DELETE_MAX_WORKERS, len(videos))
+    ) as executor:
+        return list(executor.map(delete, videos))
+
+
+def delete_empty_service_dirs(service_names: Optional[Iterable[str]] = None):
     """
     Delete service directories that are now empty after cleanup
+
+    Args:
+        service_names: Only check these service directories (the ones videos
+            were deleted from); all service directories if None
     """
-    if not VIDEO_BASE_DIR.exists():
-        return
+    if service_names is None:
+        try:
+            with os.scandir(VIDEO_BASE_DIR) as entries:
+                service_names = [entry.name for entry in entries if entry.is_dir()]
+        except FileNotFoundError:
+            return
+
+    for service_name in service_names:
+        service_dir = VIDEO_BASE_DIR / service_name
+        # Check if directory is empty (stops at the first entry)
+        try:
+            with os.scandir(service_dir) as entries:
+                is_empty = next(entries, None) is None
+        except OSError:
+            continue
 
-    for service_dir in VIDEO_BASE_DIR.iterdir():
-        if service_dir.is_dir():
-            # Check if directory is empty
-            if not any(service_dir.iterdir()):
-                try:
-                    service_dir.rmdir()
-                    logger.info(f"🗑️  Removed empty directory: {service_dir.name}")
-                except Exception as e:
-                    logger.error(f"Failed to remove directory {service_dir}: {e}")
+        if is_empty:
+            try:
+                service_dir.rmdir()
+                logger.info(f"🗑️  Removed empty directory: {service_dir.name}")
+            except Exception as e:
+                logger.error(f"Failed to remove directory {service_dir}: {e}")
 
 
 # ============================================================================
@@ -425,29 +598,35 @@ def cleanup_old_videos(
         deleted_count = 0
         failed_count = 0
         total_space_freed_mb = 0
+        services_touched = set()
 
-        for video in deletable_videos:
-            success = delete_video_safely(video, dry_run=dry_run)
+        results = _delete_videos(deletable_videos, dry_run=dry_run)
+        for video, success in zip(deletable_videos, results):
             if success:
                 deleted_count += 1
                 total_space_freed_mb += video["size_mb"]
+                services_touched.add(video["service_name"])
             else:
                 failed_count += 1
 
         # Step 4: Clean up empty directories
         if not dry_run:
-            delete_empty_service_dirs()
+            delete_empty_service_dirs(services_touched)
 
-        # Step 5: Analyze after cleanup
-        after_stats = analyze_video_storage()
+        # Step 5: Storage after cleanup, derived from the deletions instead
+        # of walking the tree again (only free space needs a disk query)
+        if dry_run:
+            after_stats = before_stats
+        else:
+            after_stats = {
+                "total_videos": before_stats["total_videos"] - deleted_count,
+                "total_size_mb": before_stats["total_size_mb"] - total_space_freed_mb,
+                "free_space_gb": get_free_space_gb(VIDEO_BASE_DIR),
+            }
 
         # Calculate additional stats
         retained_count = before_stats["total_videos"] - deleted_count
-        services_processed = (
-            len(set(v.get("service_name") for v in deletable_videos))
-            if deletable_videos
-            else 0
-        )
+        services_processed = len(services_touched)
 
         stats = {
             "started_at": datetime.now().isoformat(),
@@ -529,34 +708,56 @@ def emergency_cleanup(target_free_gb: float = MIN_FREE_SPACE_GB) -> Dict:
         f"⚠️  Low disk space: {current_free:.2f} GB " f"(need {target_free_gb} GB)"
     )
 
-    # Get ALL videos, sorted by age (oldest first)
+    # Get ALL videos as (scanned video, service) tuples
     all_videos = []
 
-    for service_dir in VIDEO_BASE_DIR.iterdir():
-        if service_dir.is_dir():
-            videos = get_service_videos(service_dir)
-            # Keep only latest version safe
-            deletable = videos[1:]  # Skip the newest
-            for video in deletable:
-                all_videos.append({**video, "service_name": service_dir.name})
+    for service_dir, videos in _scan_services(protected=1):
+        # Keep only latest version safe
+        deletable = videos[1:]  # Skip the newest
+        for video in deletable:
+            all_videos.append((video, service_dir.name))
 
-    # Sort by modified date (oldest first)
-    all_videos.sort(key=lambda x: x["modified_date"])
+    # Min-heap on modified time: the target is usually reached after the
+    # oldest few videos, so popping beats sorting the whole list
+    heapq.heapify(all_videos)
+    now = datetime.now()
 
     deleted_count = 0
     space_freed_mb = 0
 
-    for video in all_videos:
-        # Check if we've reached target
-        current_free = get_free_space_gb(VIDEO_BASE_DIR)
-        if current_free >= target_free_gb:
-            logger.info(f"✅ Target free space reached: {current_free:.2f} GB")
-            break
-
-        # Delete video
-        if delete_video_safely(video, dry_run=False):
-            deleted_count += 1
-            space_freed_mb += video["size_mb"]
+    # Progress is tracked from the sizes of deleted files instead of
+    # querying the disk after every deletion
+    needed_bytes = (target_free_gb - current_free) * (1024**3)
+    freed_bytes = 0
+
+    while all_videos and freed_bytes < needed_bytes:
+        # Next batch: only as many of the oldest videos as are needed to
+        # reach the target if every deletion succeeds
+        batch = []
+        planned_bytes = freed_bytes
+        while (
+            all_videos
+            and planned_bytes < needed_bytes
+            and len(batch) < EMERGENCY_DELETE_BATCH
+        ):
+            video, service_name = heapq.heappop(all_videos)
+            video = {**_video_details(video, now), "service_name": service_name}
+            batch.append(video)
+            planned_bytes += video["size_bytes"]
+
+        # Delete videos
+        for video, success in zip(batch, _delete_videos(batch)):
+            if success:
+                deleted_count += 1
+                space_freed_mb += video["size_mb"]
+                freed_bytes += video["size_bytes"]
+
+    # Check if we've reached target
+    if freed_bytes >= needed_bytes:
+        logger.info(
+            f"✅ Target free space reached: "
+            f"{current_free + freed_bytes / (1024**3):.2f} GB"
+        )
 
     final_free = get_free_space_gb(VIDEO_BASE_DIR)
 
@@ -585,8 +786,6 @@ def emergency_cleanup(target_free_gb: float = MIN_FREE_SPACE_GB) -> Dict:
 # ============================================================================
 
 if __name__ == "__main__":
-    import sys
-
     # Setup logging for CLI
     logging.basicConfig(
         level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
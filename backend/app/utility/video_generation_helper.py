@@ -8,6 +8,7 @@ Key changes from original:
 3. Error handling with queue status updates
 """
 
+import asyncio
 import os
 import uuid
 import logging
@@ -19,7 +20,7 @@ from sqlalchemy import desc, func
 from sqlalchemy.orm import Session
 from datetime import datetime
 # Import your existing functions
-from services.unsplash_service import fetch_and_save_photo
+from services.unsplash_service import cache_path_for, fetch_and_save_photo
 from utils.audio_utils import text_to_speech
 from utils.video_utils import create_slide, combine_slides_and_audio
 from utils.image_utils import prepare_slide_image, create_fallback_image
@@ -41,6 +42,10 @@ TEMP_DIR.mkdir(exist_ok=True)
 OUTPUT_DIR.mkdir(exist_ok=True)
 VIDEO_BASE_DIR.mkdir(exist_ok=True)
 
+# Slides are built concurrently (image fetch, TTS and clip creation are
+# mostly I/O waits); at most this many at a time
+SLIDE_CONCURRENCY = int(os.getenv("SLIDE_CONCURRENCY", "4"))
+
 
 # ============================================================================
 # BACKGROUND VIDEO GENERATION (NEW!)
@@ -125,9 +130,11 @@ async def background_video_generation(
             created_at=datetime.now(),
         )
         
+        # Insert and mark previous versions as old in one transaction;
+        # flush assigns the new video_id without a separate commit
         db.add(video_record)
-        db.commit()
-        db.refresh(video_record)
+        db.flush()
+        video_record_id = video_record.video_id
         
         # Mark previous versions as old
         db.query(models.ServiceVideo).filter(
@@ -136,7 +143,7 @@ async def background_video_generation(
         ).update({"is_new": False}, synchronize_session=False)
         db.commit()
         
-        logger.info(f"✅ Database record created (ID: {video_record.video_id})")
+        logger.info(f"✅ Database record created (ID: {video_record_id})")
         
         # ================================================================
         # STEP 6: Update queue with completed video details
@@ -146,7 +153,7 @@ async def background_video_generation(
         queue_manager.link_completed_video(
             db=db,
             video_id=video_id,
-            video_record_id=video_record.video_id,
+            video_record_id=video_record_id,
             video_url=video_url,
             video_path=video_info["video_path"],
             file_size_mb=result["file_size_mb"],
@@ -160,8 +167,11 @@ async def background_video_generation(
         # ================================================================
         # STEP 7: Push completion result to external BSK API
         # ================================================================
+        # Blocking HTTP call: run it off the event loop. It reads the status
+        # committed by link_completed_video, so it runs after it, not alongside.
         logger.info(f"📡 Pushing completion result to BSK API for {video_id}...")
-        push_ok = queue_manager.push_completion_to_external_api(
+        push_ok = await asyncio.to_thread(
+            queue_manager.push_completion_to_external_api,
             db=db,
             video_id=video_id,
         )
@@ -191,7 +201,8 @@ async def background_video_generation(
         # Notify BSK API about the failure so it can handle it on their end
         logger.info(f"📡 Pushing FAILED status to BSK API for {video_id}...")
         try:
-            queue_manager.push_completion_to_external_api(
+            await asyncio.to_thread(
+                queue_manager.push_completion_to_external_api,
                 db=db,
                 video_id=video_id,
             )
@@ -219,44 +230,76 @@ async def generate_video_from_slides(slides: List[dict], service_name: str) -> d
 
         logger.info(f"🎬 Generating video with {len(slides)} slides (IN-MEMORY)")
 
-        video_clips = []
-        audio_paths = []
+        semaphore = asyncio.Semaphore(SLIDE_CONCURRENCY)
 
-        for i, slide in enumerate(slides, 1):
-            logger.info(
-                f"🎥 Processing slide {i}/{len(slides)}: {slide.get('title', 'Untitled')}"
-            )
+        # Slides whose keywords resolve to the same cache file (or the same
+        # fallback photo) share one fetch/prepare, so concurrent slides never
+        # download or prepare the same image twice
+        photo_tasks = {}
+        prepared_tasks = {}
 
-            # Get or create image
-            try:
-                image_keyword = slide.get("image_keyword", "government training")
-                image_path = fetch_and_save_photo(image_keyword)
-                processed_image = prepare_slide_image(image_path)
-            except Exception as e:
-                logger.warning(f"⚠️ Image fetch failed, using fallback: {e}")
-                processed_image = create_fallback_image(
-                    output_path=str(TEMP_DIR / f"fallback_{i}.jpg")
+        def shared(tasks: dict, key: str, func, *args):
+            if key not in tasks:
+                tasks[key] = asyncio.ensure_future(asyncio.to_thread(func, *args))
+            return tasks[key]
+
+        async def build_slide(i: int, slide: dict) -> Tuple[object, str]:
+            async with semaphore:
+                logger.info(
+                    f"🎥 Processing slide {i}/{len(slides)}: {slide.get('title', 'Untitled')}"
                 )
 
-            # Generate narration
-            title = slide.get("title", "")
-            bullets = slide.get("bullets", [])
-            narration_text = f"{title}. " + " ".join(bullets)
-
-            # Generate audio
-            logger.info(f"Generating audio for slide {i}...")
-            audio_path = await text_to_speech(narration_text)
-            audio_paths.append(audio_path)
-
-            # Create video slide
-            logger.info(f"🎞️ Creating video clip for slide {i}...")
-            video_clip = create_slide(
-                title=title,
-                points=bullets,
-                image_path=processed_image,
-                audio_file=audio_path,
-            )
-            video_clips.append(video_clip)
+                # Get or create image
+                try:
+                    image_keyword = slide.get("image_keyword", "government training")
+                    image_path = await shared(
+                        photo_tasks,
+                        cache_path_for(image_keyword),
+                        fetch_and_save_photo,
+                        image_keyword,
+                    )
+                    processed_image = await shared(
+                        prepared_tasks, image_path, prepare_slide_image, image_path
+                    )
+                except Exception as e:
+                    logger.warning(f"⚠️ Image fetch failed, using fallback: {e}")
+                    processed_image = await asyncio.to_thread(
+                        create_fallback_image,
+                        output_path=str(TEMP_DIR / f"fallback_{i}.jpg"),
+                    )
+
+                # Generate narration
+                title = slide.get("title", "")
+                bullets = slide.get("bullets", [])
+                narration_text = f"{title}. " + " ".join(bullets)
+
+                # Generate audio
+                logger.info(f"Generating audio for slide {i}...")
+                audio_path = await text_to_speech(narration_text)
+
+                # Create video slide
+                logger.info(f"🎞️ Creating video clip for slide {i}...")
+                video_clip = await asyncio.to_thread(
+                    create_slide,
+                    title=title,
+                    points=bullets,
+                    image_path=processed_image,
+                    audio_file=audio_path,
+                )
+                return video_clip, audio_path
+
+        # Let every slide finish before reporting a failure, so no slide task
+        # is left running; results keep slide order
+        results = await asyncio.gather(
+            *(build_slide(i, slide) for i, slide in enumerate(slides, 1)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        video_clips = [video_clip for video_clip, _ in results]
+        audio_paths = [audio_path for _, audio_path in results]
 
         # Combine all slides - save to TEMP first
         logger.info("🎬 Combining slides into temporary video...")
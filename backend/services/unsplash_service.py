@@ -8,6 +8,7 @@ Goals:
 """
 
 import os
+import uuid
 import requests
 import hashlib
 from urllib.parse import quote_plus
@@ -48,6 +49,15 @@ def cached_image_path(query: str) -> str:
     return os.path.join(IMAGE_CACHE_DIR, f"{hash_key}.jpg")
 
 
+def cache_path_for(query: str) -> str:
+    """
+    Cache file a raw (un-normalized) query resolves to
+    """
+    if not query or not query.strip():
+        query = "government training presentation"
+    return cached_image_path(normalize_query(query))
+
+
 # -------------------------------------------------
 # UNSPLASH FETCH
 # -------------------------------------------------
@@ -89,7 +99,7 @@ def fetch_and_save_photo(query: str) -> str:
     # -----------------------------
     # CACHE CHECK
     # -----------------------------
-    image_path = cached_image_path(query)
+    image_path = cache_path_for(query)
     if os.path.exists(image_path):
         return image_path
 
@@ -101,8 +111,17 @@ def fetch_and_save_photo(query: str) -> str:
         image_url = photo["urls"]["regular"]
 
         image_data = requests.get(image_url, timeout=10).content
-        with open(image_path, "wb") as f:
-            f.write(image_data)
+
+        # Write to a private temp file and rename, so readers never see a
+        # half-written image at the cache path
+        tmp_path = f"{image_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(image_data)
+            os.replace(tmp_path, image_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
         return image_path
 